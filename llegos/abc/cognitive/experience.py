@@ -0,0 +1,158 @@
+import typing as t
+from threading import RLock
+
+import numpy as np
+from networkx import DiGraph
+
+from llegos.research import Message
+
+
+class ExperienceStore:
+    """
+    A bounded replay buffer of weighted (source, target) message transitions.
+
+    Messages are interned to integer node ids, and edges live in a ring buffer of
+    NumPy arrays, so once it is full the oldest experience is evicted first. Weights
+    and errors can be read, updated, and sampled in vectorized batches by slot.
+
+    It is safe to share between threads, like planning rollouts on a thread pool.
+    """
+
+    def __init__(self, capacity: int = 65_536):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+
+        self.capacity = capacity
+        self.evictions = 0
+        self._sources = np.full(capacity, -1, dtype=np.int64)
+        self._targets = np.full(capacity, -1, dtype=np.int64)
+        self._weights = np.zeros(capacity, dtype=np.float64)
+        self._errors = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+        self._cursor = 0
+        self._slots: dict[tuple[int, int], int] = {}
+        self._node_ids: dict[str, int] = {}
+        self._nodes: dict[int, Message] = {}
+        self._refcounts: dict[int, int] = {}
+        self._next_node_id = 0
+        self._lock = RLock()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, edge: tuple[Message, Message]) -> bool:
+        return self.get(*edge) is not None
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._weights[: self._size]
+
+    @property
+    def errors(self) -> np.ndarray:
+        return self._errors[: self._size]
+
+    def _intern(self, message: Message) -> int:
+        if (node_id := self._node_ids.get(message.id)) is None:
+            node_id = self._node_ids[message.id] = self._next_node_id
+            self._nodes[node_id] = message
+            self._refcounts[node_id] = 0
+            self._next_node_id += 1
+        self._refcounts[node_id] += 1
+        return node_id
+
+    def _release(self, node_id: int):
+        self._refcounts[node_id] -= 1
+        if self._refcounts[node_id] == 0:
+            del self._refcounts[node_id]
+            del self._node_ids[self._nodes.pop(node_id).id]
+
+    def get(self, source: Message, target: Message) -> t.Optional[int]:
+        with self._lock:
+            source_id = self._node_ids.get(source.id)
+            target_id = self._node_ids.get(target.id)
+            if source_id is None or target_id is None:
+                return None
+            return self._slots.get((source_id, target_id))
+
+    def add(
+        self, source: Message, target: Message, weight: float = 0.0, error: float = 0.0
+    ):
+        """
+        Record a transition, or overwrite it if it is already recorded. Returns its slot.
+        """
+        with self._lock:
+            if (slot := self.get(source, target)) is not None:
+                self._weights[slot] = weight
+                self._errors[slot] = error
+                return slot
+
+            slot = self._cursor
+            if self._size == self.capacity:
+                evicted = (int(self._sources[slot]), int(self._targets[slot]))
+                del self._slots[evicted]
+                for node_id in evicted:
+                    self._release(node_id)
+                self.evictions += 1
+            else:
+                self._size += 1
+
+            edge = (self._intern(source), self._intern(target))
+            self._sources[slot], self._targets[slot] = edge
+            self._weights[slot] = weight
+            self._errors[slot] = error
+            self._slots[edge] = slot
+            self._cursor = (slot + 1) % self.capacity
+            return slot
+
+    def update(
+        self,
+        slots: np.ndarray,
+        weights: t.Optional[np.ndarray] = None,
+        errors: t.Optional[np.ndarray] = None,
+    ):
+        with self._lock:
+            if weights is not None:
+                self._weights[slots] = weights
+            if errors is not None:
+                self._errors[slots] = errors
+
+    def sample(
+        self,
+        k: int,
+        prioritized: bool = False,
+        rng: t.Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        """
+        Sample up to k distinct slots, uniformly or in proportion to their absolute error.
+        """
+        rng = rng or np.random.default_rng()
+        with self._lock:
+            size = self._size
+            k = min(k, size)
+            p = None
+            if prioritized and (priorities := np.abs(self._errors[:size])).sum() > 0:
+                p = priorities / priorities.sum()
+                k = min(k, int(np.count_nonzero(p)))
+        return rng.choice(size, size=k, replace=False, p=p)
+
+    def edges(self, slots: t.Iterable[int]) -> list[tuple[Message, Message]]:
+        with self._lock:
+            return [
+                (
+                    self._nodes[int(self._sources[slot])],
+                    self._nodes[int(self._targets[slot])],
+                )
+                for slot in slots
+            ]
+
+    def to_networkx(self) -> DiGraph:
+        g = DiGraph()
+        with self._lock:
+            for slot, (source, target) in enumerate(self.edges(range(self._size))):
+                g.add_edge(
+                    source,
+                    target,
+                    weight=float(self._weights[slot]),
+                    error=float(self._errors[slot]),
+                )
+        return g
@@ -0,0 +1,257 @@
+import typing as t
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from heapq import nsmallest
+from operator import attrgetter
+from threading import Lock
+from time import perf_counter
+
+from pydantic import BaseModel, Field
+
+from llegos.research import Message, message_digest
+
+if t.TYPE_CHECKING:
+    from llegos.abc.cognitive.reinforcement import (
+        Action,
+        ActionBehavior,
+        CostBehavior,
+        Percept,
+        RewardBehavior,
+        WorldModelBehavior,
+    )
+
+
+class DepthStats(BaseModel):
+    depth: int
+    beam: int = Field(description="Candidates expanded at this depth")
+    rollouts: int = Field(description="Actions rolled out through the world model")
+    hits: int = Field(
+        default=0, description="Rollouts served from the transposition table"
+    )
+    propose_seconds: float = Field(description="Time spent proposing actions")
+    rollout_seconds: float = Field(
+        description="Time spent predicting and costing actions"
+    )
+    prune_seconds: float = Field(description="Time spent selecting the next beam")
+
+
+class Plan(BaseModel):
+    cost: float = Field(description="Cumulative predicted cost of the plan")
+    actions: list[Message]
+    steps: list[Message] = Field(description="The predicted step after each action")
+    stats: list[DepthStats] = Field(default_factory=list)
+
+
+class TranspositionTable:
+    """
+    A bounded, least-recently-used memo of world-model rollouts, keyed on the content
+    of the step and the action taken from it. Clear it whenever the world model or
+    cost model learn, since their predictions are stale after.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[t.Hashable, t.Any] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def lookup(self, key: t.Hashable, compute: t.Callable[[], t.Any]) -> t.Any:
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Rollout(t.NamedTuple):
+    """
+    What a transposition table keeps of a rollout: the predicted step's content, not
+    the step itself, whose parents belong to the plan it was predicted in.
+    """
+
+    cls: type[Message]
+    fields: dict[str, t.Any]
+    sender: t.Any
+    receiver: t.Any
+    cost: float
+
+    @classmethod
+    def of(cls, step: "Percept", cost: float) -> "Rollout":
+        fields = step.model_dump(
+            exclude={"id", "created_at", "sender", "receiver", "parent"}
+        )
+        return cls(step.__class__, fields, step.sender, step.receiver, cost)
+
+    def step(self, action: "Action") -> "Percept":
+        "The predicted step, as a reply to the action taken in this plan."
+        return self.cls(
+            sender=self.sender, receiver=self.receiver, parent=action, **self.fields
+        )
+
+
+class Candidate(t.NamedTuple):
+    cost: float
+    step: "Percept"
+    actions: tuple["Action", ...]
+    steps: tuple["Percept", ...]
+
+
+class BeamSearch:
+    """
+    Plans action_lookahead steps ahead, keeping the beam_width cheapest candidate
+    plans at every depth. World-model rollouts for a depth are evaluated on the
+    executor, if one is given, otherwise serially.
+
+    The executor must be a thread pool: rollouts run in copies of the caller's context
+    and share the behaviors and transposition table, none of which cross processes.
+    """
+
+    def __init__(
+        self,
+        action: "ActionBehavior",
+        world_model: "WorldModelBehavior",
+        cost: "CostBehavior",
+        reward: "RewardBehavior",
+        beam_width: int = 1,
+        executor: t.Optional[ThreadPoolExecutor] = None,
+        transpositions: t.Optional[TranspositionTable] = None,
+    ):
+        if beam_width <= 0:
+            raise ValueError("beam_width must be greater than 0")
+        if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+            raise TypeError("executor must be a ThreadPoolExecutor", executor)
+
+        self.action = action
+        self.world_model = world_model
+        self.cost = cost
+        self.reward = reward
+        self.beam_width = beam_width
+        self.executor = executor
+        self.transpositions = transpositions
+
+    def propose(self, step: "Percept") -> list["Action"]:
+        prior_cost = self.cost.forward(step)
+        prior_reward = self.reward.forward(prior_cost)
+        return list(self.action.forward(prior_reward))
+
+    def predict(self, action: "Action") -> tuple["Percept", float]:
+        predicted_step = self.world_model.forward(action)
+        predicted_loss = self.cost.forward(predicted_step)
+        return predicted_step, predicted_loss.value
+
+    def rollout(self, step: "Percept", action: "Action") -> tuple["Percept", float]:
+        if self.transpositions is None:
+            return self.predict(action)
+
+        predicted: list["Percept"] = []
+
+        def predict() -> Rollout:
+            predicted_step, cost = self.predict(action)
+            predicted.append(predicted_step)
+            return Rollout.of(predicted_step, cost)
+
+        key = (message_digest(step), message_digest(action))
+        rollout = self.transpositions.lookup(key, predict)
+        return (predicted[0] if predicted else rollout.step(action)), rollout.cost
+
+    def _rollouts(
+        self, expansions: list[tuple[Candidate, "Action"]]
+    ) -> list[tuple["Percept", float]]:
+        if self.executor is None:
+            return [
+                self.rollout(candidate.step, action) for candidate, action in expansions
+            ]
+        futures = [
+            self.executor.submit(
+                copy_context().run, self.rollout, candidate.step, action
+            )
+            for candidate, action in expansions
+        ]
+        return [future.result() for future in futures]
+
+    def search(self, step: "Percept", action_lookahead: int) -> Plan:
+        if action_lookahead <= 0:
+            raise ValueError("action_lookahead must be greater than 0")
+
+        beam = [Candidate(0.0, step, (), ())]
+        stats: list[DepthStats] = []
+
+        for depth in range(1, action_lookahead + 1):
+            width = len(beam)
+            started = perf_counter()
+            expansions = [
+                (candidate, action)
+                for candidate in beam
+                for action in self.propose(candidate.step)
+            ]
+            proposed = perf_counter()
+
+            hits = self.transpositions.hits if self.transpositions else 0
+            rollouts = self._rollouts(expansions)
+            hits = (self.transpositions.hits if self.transpositions else 0) - hits
+            rolled_out = perf_counter()
+
+            candidates = [
+                Candidate(
+                    candidate.cost + cost,
+                    predicted_step,
+                    (*candidate.actions, action),
+                    (*candidate.steps, predicted_step),
+                )
+                for (candidate, action), (predicted_step, cost) in zip(
+                    expansions, rollouts
+                )
+            ]
+            if not candidates:
+                raise ValueError("No predictions were made.")
+            beam = nsmallest(self.beam_width, candidates, key=attrgetter("cost"))
+            pruned = perf_counter()
+
+            stats.append(
+                DepthStats(
+                    depth=depth,
+                    beam=width,
+                    rollouts=len(expansions),
+                    hits=hits,
+                    propose_seconds=proposed - started,
+                    rollout_seconds=rolled_out - proposed,
+                    prune_seconds=pruned - rolled_out,
+                )
+            )
+
+        best = beam[0]
+        return Plan(
+            cost=best.cost,
+            actions=list(best.actions),
+            steps=list(best.steps),
+            stats=stats,
+        )
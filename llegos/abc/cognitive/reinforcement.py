@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 
-from beartype.typing import AsyncIterable
-from networkx import DiGraph
+from beartype.typing import AsyncIterable, Callable, Optional, Sequence
+from pydantic import PrivateAttr
 
-from llegos.research import Actor, Field, Message, message_path
+from llegos.abc.cognitive.experience import ExperienceStore
+from llegos.abc.cognitive.planning import BeamSearch, Plan, TranspositionTable
+from llegos.research import Actor, Field, Message
 
 
 class Percept(Message):
@@ -20,11 +23,11 @@ class Action(Message):
 
 
 class Cost(Message):
-    value: float = Field(gte=0)
+    value: float = Field(ge=0)
 
 
 class CostBehavior(Actor, ABC):
-    _loss_landscape: DiGraph = Field(default_factory=DiGraph)
+    _loss_landscape: ExperienceStore = PrivateAttr(default_factory=ExperienceStore)
 
     @abstractmethod
     def forward(self, predicted_step: Percept) -> Cost:
@@ -32,20 +35,27 @@ class CostBehavior(Actor, ABC):
         previous_step: Percept = action.parent
         loss = Cost.reply_to(action, value=0)
 
-        self.loss_landscape.add_edge(previous_step, predicted_step, weight=loss.value)
+        self._loss_landscape.add(previous_step, predicted_step, weight=loss.value)
 
         return loss
 
     @abstractmethod
     def backward(self, realized_step: Percept) -> Cost:
         action: Action = realized_step.parent
-
-        edge = self.loss_landscape[action][realized_step]
-        predicted_loss = edge["weight"]
+        previous_step: Percept = action.parent
         actual_loss = 0
 
-        edge["weight"] = actual_loss
-        edge["error"] = predicted_loss - actual_loss
+        slot = self._loss_landscape.get(previous_step, realized_step)
+        predicted_loss = (
+            actual_loss if slot is None else self._loss_landscape.weights[slot]
+        )
+
+        self._loss_landscape.add(
+            previous_step,
+            realized_step,
+            weight=actual_loss,
+            error=predicted_loss - actual_loss,
+        )
 
         return Cost.reply_to(realized_step, value=actual_loss)
 
@@ -55,14 +65,14 @@ class Reward(Message):
 
 
 class RewardBehavior(Actor, ABC):
-    reward_path: DiGraph = Field(default_factory=DiGraph, include=False, exclude=True)
+    reward_path: ExperienceStore = Field(default_factory=ExperienceStore, exclude=True)
 
     @abstractmethod
     def forward(self, message: Cost) -> Reward:
         reward = Reward.reply_to(message, value=0)
 
         if (gen := message.parent) and (re := gen.parent):
-            self.reward_path.add_weighted_edges_from([(re, gen, reward.value)])
+            self.reward_path.add(re, gen, reward.value)
 
         return reward
 
@@ -71,7 +81,7 @@ class RewardBehavior(Actor, ABC):
         reward = Reward.reply_to(message, value=1)
 
         if (gen := message.parent) and (re := gen.parent):
-            self.reward_path.add_weighted_edges_from([(re, gen, reward.value)])
+            self.reward_path.add(re, gen, reward.value)
 
         return reward
 
@@ -85,6 +95,11 @@ class ActionBehavior(Actor, ABC):
     def backward(self, realized_step: Percept):
         "Update the model based on the material step."
 
+    def backward_batch(self, realized_steps: Sequence[Percept]):
+        "Update the model based on many material steps, override to update in one batch."
+        for realized_step in realized_steps:
+            self.backward(realized_step)
+
 
 class WorldModelBehavior(Actor, ABC):
     @abstractmethod
@@ -95,45 +110,62 @@ class WorldModelBehavior(Actor, ABC):
     def backward(self, realized_step: Percept):
         "Update the model based on the material step."
 
+    def backward_batch(self, realized_steps: Sequence[Percept]):
+        "Update the model based on many material steps, override to update in one batch."
+        for realized_step in realized_steps:
+            self.backward(realized_step)
+
 
 class ExecutiveBehavior(Actor, ABC):
     _cost: CostBehavior
     _reward: RewardBehavior
     _action: ActionBehavior
     _world_model: WorldModelBehavior
+    _executor: Optional[ThreadPoolExecutor] = None  # threads only, behaviors are shared
+    _transpositions: TranspositionTable = PrivateAttr(
+        default_factory=TranspositionTable
+    )
+
+    beam_width: int = Field(default=1, ge=1)
+
+    def plan(self, step: Percept, action_lookahead: int) -> Plan:
+        return BeamSearch(
+            action=self._action,
+            world_model=self._world_model,
+            cost=self._cost,
+            reward=self._reward,
+            beam_width=self.beam_width,
+            executor=self._executor,
+            transpositions=self._transpositions,
+        ).search(step, action_lookahead)
 
     def forward(self, step: Percept, action_lookahead: int) -> Action:
-        if action_lookahead <= 0:
-            raise ValueError("search_depth must be greater than 0")
-
-        future_actions: list[tuple[Action, float]] = []
-
-        prior_cost = self._cost.forward(step)
-        prior_reward = self._reward.forward(prior_cost)
-
-        predictions: list[Percept] = []
-        for action in self._action.forward(prior_reward):
-            predicted_step = self._world_model.forward(action)
-            predictions.append(predicted_step)
-            predicted_loss = self._cost.forward(predicted_step)
-
-            foresight = (action, predicted_loss.value)
-            future_actions.append(foresight)
-
-        action = sorted(future_actions, key=itemgetter(1))[0][0]
-        if action_lookahead == 1:
-            return action
-
-        if not predictions:
-            raise ValueError("No predictions were made.")
-
-        final_action = self.forward(predictions[-1], action_lookahead - 1)
-        predictions = message_path(step, final_action)
-        next_action = next(p for p in predictions if isinstance(p, Action))
-        return next_action
+        return self.plan(step, action_lookahead).actions[0]
 
     def backward(self, step: Percept):
-        loss = self._cost.backward(step)
-        reward = self._reward.backward(loss)
-        self._action.backward(reward)
-        self._world_model.backward(reward)
+        self.backward_batch([step])
+
+    def backward_batch(self, steps: Sequence[Percept]):
+        losses = [self._cost.backward(step) for step in steps]
+        rewards = [self._reward.backward(loss) for loss in losses]
+
+        # The action and world models only depend on the rewards, not on each other
+        self._concurrently(
+            lambda: self._action.backward_batch(rewards),
+            lambda: self._world_model.backward_batch(rewards),
+        )
+        self._transpositions.clear()
+
+    def _concurrently(self, *updates: Callable[[], None]):
+        if self._executor is None:
+            for update in updates:
+                update()
+            return
+        if not isinstance(self._executor, ThreadPoolExecutor):
+            raise TypeError("_executor must be a ThreadPoolExecutor", self._executor)
+
+        futures = [
+            self._executor.submit(copy_context().run, update) for update in updates
+        ]
+        for future in futures:
+            future.result()
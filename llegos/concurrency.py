@@ -0,0 +1,289 @@
+import typing as t
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextvars import copy_context
+from datetime import datetime, timedelta
+from threading import Lock
+from time import perf_counter
+
+from beartype import beartype
+from beartype.typing import Callable, Hashable, Iterator, Optional, Sequence
+from pydantic import Field
+
+from llegos.research import (
+    Actor,
+    Message,
+    MissingReceiver,
+    Object,
+    message_digest,
+    message_send,
+)
+
+
+def _collect(message: Message) -> list[Message]:
+    return [reply for reply in message_send(message) if reply]
+
+
+class Gathering(Object):
+    reason: t.Literal["quorum", "threshold", "deadline", "exhausted"] = "exhausted"
+    replies: list[Message] = Field(default_factory=list)
+    errors: list[Exception] = Field(default_factory=list)
+    pending: list[Actor] = Field(
+        default_factory=list,
+        description="Receivers that had not replied when gathering ended",
+    )
+    late: list[Message] = Field(
+        default_factory=list,
+        description="Replies from pending receivers, as they arrive",
+    )
+
+    def _record_late(self, future: Future):
+        if future.cancelled():
+            return
+        try:
+            self.late.extend(future.result())
+        except Exception as error:
+            self.errors.append(error)
+
+
+@beartype
+def message_gather(
+    message: Message,
+    receivers: Optional[Sequence[Actor]] = None,
+    quorum: Optional[int] = None,
+    timeout: Optional[int | float] = None,
+    score: Optional[Callable[[Message], int | float]] = None,
+    threshold: Optional[int | float] = None,
+    executor: Optional[Executor] = None,
+) -> Gathering:
+    """
+    Forward the message to every receiver at once, and gather their replies until a
+    quorum of receivers has replied, a reply scores at least the threshold, or the
+    timeout (or the message's own deadline) passes, whichever comes first.
+
+    Receivers that haven't started yet are cancelled, and the forwarded messages carry
+    the deadline, so queued work is dropped. Replies that arrive afterwards are
+    recorded in Gathering.late without blocking the caller.
+    """
+    if receivers is None:
+        receivers = message.receiver.receivers(message.__class__)
+
+    deadline = message.deadline
+    if timeout is not None:
+        timeout_at = datetime.utcnow() + timedelta(seconds=timeout)
+        deadline = min(deadline, timeout_at) if deadline else timeout_at
+
+    pool = executor or ThreadPoolExecutor(max_workers=max(len(receivers), 1))
+    futures = {
+        pool.submit(
+            copy_context().run,
+            _collect,
+            message.forward_to(receiver, deadline=deadline),
+        ): receiver
+        for receiver in receivers
+    }
+
+    gathering = Gathering()
+    responded = 0
+    remaining = set(futures)
+    while remaining:
+        wait_timeout = None
+        if deadline is not None:
+            wait_timeout = max((deadline - datetime.utcnow()).total_seconds(), 0)
+        done, remaining = wait(
+            remaining, timeout=wait_timeout, return_when=FIRST_COMPLETED
+        )
+        if not done:
+            gathering.reason = "deadline"
+            break
+
+        for future in done:
+            try:
+                replies = future.result()
+            except Exception as error:
+                gathering.errors.append(error)
+                continue
+            gathering.replies.extend(replies)
+            responded += bool(replies)
+
+        if (
+            score
+            and threshold is not None
+            and any(score(reply) >= threshold for reply in gathering.replies)
+        ):
+            gathering.reason = "threshold"
+            break
+        if quorum is not None and responded >= quorum:
+            gathering.reason = "quorum"
+            break
+
+    for future in remaining:
+        future.cancel()
+        gathering.pending.append(futures[future])
+        future.add_done_callback(gathering._record_late)
+
+    if executor is None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return gathering
+
+
+class Hedge:
+    """
+    Sends a message to one of several interchangeable receivers, and if it hasn't
+    replied within the hedging delay, sends it to a second one too. The first reply
+    wins, and the other request is cancelled if it hasn't started yet.
+
+    The delay is either fixed, or a percentile of the latencies measured so far. Until
+    min_samples latencies have been measured, requests aren't hedged.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[int | float] = None,
+        percentile: int | float = 95,
+        window: int = 1000,
+        min_samples: int = 10,
+        executor: Optional[Executor] = None,
+    ):
+        self.fixed_delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.executor = executor
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = Lock()
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.requests if self.requests else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        "How often a hedged request was answered by the hedge first."
+        return self.hedge_wins / self.hedged if self.hedged else 0.0
+
+    def delay(self) -> Optional[float]:
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return None
+        index = round(self.percentile / 100 * (len(latencies) - 1))
+        return latencies[index]
+
+    def _submit(self, pool: Executor, message: Message, receiver: Actor) -> Future:
+        started = perf_counter()
+        future = pool.submit(copy_context().run, _collect, message.forward_to(receiver))
+
+        def measure(future: Future):
+            if not future.cancelled() and future.exception() is None:
+                with self._lock:
+                    self._latencies.append(perf_counter() - started)
+
+        future.add_done_callback(measure)
+        return future
+
+    @beartype
+    def send(
+        self, message: Message, receivers: Optional[Sequence[Actor]] = None
+    ) -> list[Message]:
+        if receivers is None:
+            receivers = message.receiver.receivers(message.__class__)
+        if not receivers:
+            raise MissingReceiver(message)
+
+        with self._lock:
+            self.requests += 1
+
+        pool = self.executor or ThreadPoolExecutor(max_workers=2)
+        try:
+            primary = self._submit(pool, message, receivers[0])
+            done, _ = wait([primary], timeout=self.delay())
+            if done or len(receivers) < 2:
+                return primary.result()
+
+            hedge = self._submit(pool, message, receivers[1])
+            with self._lock:
+                self.hedged += 1
+
+            done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+            winner, loser = (primary, hedge) if primary in done else (hedge, primary)
+            if winner.exception() is not None:
+                winner, loser = loser, winner
+            loser.cancel()
+
+            if winner is hedge:
+                with self._lock:
+                    self.hedge_wins += 1
+            return winner.result()
+        finally:
+            if self.executor is None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fields_key(*fields: str) -> Callable[[Message], Hashable]:
+    "A SingleFlight key over the message's class and the given fields."
+    return lambda message: (message.__class__, *(getattr(message, f) for f in fields))
+
+
+class SingleFlight:
+    """
+    An applicator that coalesces identical in-flight messages to the same receiver,
+    so that they share a single execution of its handler.
+
+    Messages are identical when their keys match, by default when their content does.
+    Every caller gets its own copy of the replies, re-parented onto its own message.
+    """
+
+    def __init__(self, key: Callable[[Message], Hashable] = message_digest):
+        self.key = key
+        self.executions = 0
+        self.coalesced = 0
+        self._flights: dict[Hashable, tuple[Message, Future]] = {}
+        self._lock = Lock()
+
+    def __call__(self, message: Message) -> Iterator[Message]:
+        return self.send(message)
+
+    @beartype
+    def send(self, message: Message) -> Iterator[Message]:
+        key = (message.receiver.id, self.key(message))
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = (message, Future())
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        leader, future = flight
+        if leader is message:
+            try:
+                future.set_result(_collect(message))
+            except Exception as error:
+                future.set_exception(error)
+            finally:
+                with self._lock:
+                    del self._flights[key]
+            yield from future.result()
+            return
+
+        for reply in future.result():
+            yield reply.__class__.lift(
+                reply,
+                sender=reply.sender,
+                receiver=message.sender
+                if reply.receiver is leader.sender
+                else reply.receiver,
+                parent=message if reply.parent is leader else reply.parent,
+            )
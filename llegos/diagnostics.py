@@ -0,0 +1,192 @@
+import gc
+import sys
+import typing as t
+from collections import defaultdict
+from datetime import datetime
+
+from networkx import Graph
+from pydantic import BaseModel, Field
+from pyee import EventEmitter
+
+from llegos.graphs import CompactGraph
+from llegos.registry import LazyScene
+from llegos.research import Actor, Message, Object, Scene
+
+
+class Usage(BaseModel):
+    count: int = 0
+    bytes: int = Field(
+        default=0, description="Approximate, excluding referenced Objects"
+    )
+
+    def add(self, nbytes: int):
+        self.count += 1
+        self.bytes += nbytes
+
+
+def approximate_size(value: t.Any) -> int:
+    """
+    The size of a value and the containers within it, excluding any Objects it
+    references, which are accounted for on their own.
+    """
+    seen: set[int] = set()
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Object) or id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        match value:
+            case dict():
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            case list() | tuple() | set() | frozenset():
+                stack.extend(value)
+    return size
+
+
+def object_size(obj: Object) -> int:
+    return (
+        sys.getsizeof(obj)
+        + approximate_size(obj.__dict__)
+        + approximate_size(obj.__pydantic_extra__ or {})
+    )
+
+
+def listener_count(actor: Actor) -> int:
+    emitter: EventEmitter = actor._event_emitter
+    return sum(len(emitter.listeners(event)) for event in emitter.event_names())
+
+
+def retained_objects(root: Object) -> t.Iterator[Object]:
+    """
+    Every Object reachable from the root through fields, private attributes, graphs and
+    containers, without descending into other Scenes.
+    """
+    seen: set[int] = set()
+    stack: list[t.Any] = [root]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        match value:
+            case Scene() if value is not root:
+                yield value
+            case Object():
+                yield value
+                stack.extend(value.__dict__.values())
+                stack.extend((value.__pydantic_extra__ or {}).values())
+                stack.extend((value.__pydantic_private__ or {}).values())
+            case Graph():
+                stack.extend(value.nodes)
+                stack.extend(data for _u, _v, data in value.edges(data=True))
+            case CompactGraph():
+                stack.extend(value.nodes)
+                stack.extend(value._columns.values())
+            case dict():
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            case list() | tuple() | set() | frozenset():
+                stack.extend(value)
+
+
+def conversation_root(message: Message) -> Message:
+    while message.parent is not None:
+        message = message.parent
+    return message
+
+
+class SceneReport(BaseModel):
+    scene_id: str
+    actors: int
+    nodes: int
+    edges: int
+    listeners: dict[str, int] = Field(description="Event listeners per actor id")
+    messages: int
+    conversations: dict[str, int] = Field(
+        description="Retained messages per root message id"
+    )
+    message_classes: dict[str, Usage]
+
+
+def members(scene: Scene) -> t.Sequence[Actor]:
+    "The scene's own actors, only those materialized in a LazyScene."
+    if isinstance(scene, LazyScene):
+        return scene.materialized
+    return scene.actors
+
+
+def scene_report(scene: Scene) -> SceneReport:
+    """
+    Counts the scene's own actors, while messages are counted however they are reached,
+    including through actors outside of the scene.
+    """
+    actors = members(scene)
+    message_classes: dict[str, Usage] = defaultdict(Usage)
+    conversations: dict[str, int] = defaultdict(int)
+    messages = 0
+
+    for obj in retained_objects(scene):
+        match obj:
+            case Message():
+                messages += 1
+                conversations[conversation_root(obj).id] += 1
+                message_classes[obj.__class__.__name__].add(object_size(obj))
+
+    return SceneReport(
+        scene_id=scene.id,
+        actors=len(actors),
+        nodes=scene._graph.number_of_nodes(),
+        edges=scene._graph.number_of_edges(),
+        listeners={actor.id: listener_count(actor) for actor in actors},
+        messages=messages,
+        conversations=dict(conversations),
+        message_classes=dict(message_classes),
+    )
+
+
+def class_defaults_report() -> dict[str, int]:
+    """
+    Every Scene and Actor copies its graph and event emitter from these process-wide
+    defaults, so anything added to them leaks into every instance created afterwards.
+    """
+    graph: Graph = Scene.__private_attributes__["_graph"].default
+    emitter: EventEmitter = Actor.__private_attributes__["_event_emitter"].default
+    return {
+        "scene_graph_nodes": graph.number_of_nodes(),
+        "scene_graph_edges": graph.number_of_edges(),
+        "actor_listeners": sum(
+            len(emitter.listeners(e)) for e in emitter.event_names()
+        ),
+    }
+
+
+class Snapshot(BaseModel):
+    taken_at: datetime = Field(default_factory=datetime.utcnow)
+    objects: dict[str, Usage]
+
+    def diff(self, earlier: "Snapshot") -> dict[str, Usage]:
+        "The growth in live Objects, per class, since the earlier snapshot."
+        growth = {}
+        for name in self.objects.keys() | earlier.objects.keys():
+            after = self.objects.get(name, Usage())
+            before = earlier.objects.get(name, Usage())
+            if after.count != before.count or after.bytes != before.bytes:
+                growth[name] = Usage(
+                    count=after.count - before.count,
+                    bytes=after.bytes - before.bytes,
+                )
+        return growth
+
+
+def snapshot() -> Snapshot:
+    "A census of every live Object in the process, by class."
+    gc.collect()
+    objects: dict[str, Usage] = defaultdict(Usage)
+    for obj in gc.get_objects():
+        if isinstance(obj, Object):
+            objects[obj.__class__.__qualname__].add(object_size(obj))
+    return Snapshot(objects=dict(objects))
@@ -0,0 +1,170 @@
+import typing as t
+from collections import deque
+from threading import Condition, Event, Thread
+from time import time
+
+from beartype.typing import Callable, Optional
+
+from llegos.research import Actor
+
+LIFECYCLE = ("before:receive", "after:receive")
+
+
+class LifecycleEvent(t.NamedTuple):
+    name: str
+    actor: Actor
+    args: tuple
+    at: float  # seconds since the epoch
+
+
+Subscriber = Callable[[list[LifecycleEvent]], t.Any]
+
+
+class EventSink:
+    """
+    Takes observability off the critical path: actors' events are only enqueued as
+    they are emitted, and a background thread delivers them to subscribers in batches.
+
+    The queue is bounded. When it is full, the policy decides what gives: the newest
+    event is dropped, the oldest is, or the emitting actor blocks until there is room,
+    for at most block_timeout seconds, before dropping it. Lost events are counted, as
+    are subscriber errors, which are otherwise swallowed.
+    """
+
+    def __init__(
+        self,
+        *subscribers: Subscriber,
+        maxsize: int = 65_536,
+        batch_size: int = 1024,
+        policy: t.Literal["drop_newest", "drop_oldest", "block"] = "drop_newest",
+        block_timeout: Optional[float] = None,
+        flush_interval: float = 0.1,
+    ):
+        self.subscribers = list(subscribers)
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.flush_interval = flush_interval
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue: deque[LifecycleEvent] = deque(
+            maxlen=maxsize if policy == "drop_oldest" else None
+        )
+        self._room = Condition()
+        self._ready = Event()
+        self._closed = Event()
+        self._draining = 0
+        self._drainer = Thread(target=self._drain, name="llegos.events", daemon=True)
+        self._drainer.start()
+
+    def subscribe(self, subscriber: Subscriber):
+        self.subscribers.append(subscriber)
+
+    def attach(self, *actors: Actor, events: t.Sequence[str] = LIFECYCLE):
+        for actor in actors:
+            for name in events:
+                actor.on(name, self._listener(name, actor))
+
+    def _listener(self, name: str, actor: Actor) -> Callable:
+        def enqueue(*args):
+            self.put(LifecycleEvent(name, actor, args, time()))
+
+        return enqueue
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def put(self, event: LifecycleEvent) -> bool:
+        "Enqueue an event, returning whether it was accepted."
+        with self._room:
+            if len(self._queue) >= self.maxsize:
+                match self.policy:
+                    case "drop_oldest":
+                        self.dropped += 1  # the deque's maxlen evicts it
+                    case "block" if self._wait_for_room():
+                        pass
+                    case _:
+                        self.dropped += 1
+                        return False
+            self._queue.append(event)
+            self.enqueued += 1
+            full = len(self._queue) >= self.batch_size
+        if full:
+            self._ready.set()
+        return True
+
+    def _wait_for_room(self) -> bool:
+        "Called holding _room, which waiting releases."
+        self._ready.set()
+        return (
+            self._room.wait_for(
+                lambda: len(self._queue) < self.maxsize or self._closed.is_set(),
+                timeout=self.block_timeout,
+            )
+            and len(self._queue) < self.maxsize
+        )
+
+    def _drain(self):
+        while not self._closed.is_set():
+            self._ready.wait(self.flush_interval)
+            self._ready.clear()
+            self._deliver_all()
+        self._deliver_all()
+
+    def _deliver_all(self):
+        while True:
+            with self._room:
+                if not self._queue:
+                    return
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                self._draining += 1
+                self._room.notify_all()
+            errors = 0
+            try:
+                for subscriber in self.subscribers:
+                    try:
+                        subscriber(batch)
+                    except Exception:
+                        errors += 1
+            finally:
+                with self._room:
+                    self.delivered += len(batch)
+                    self.errors += errors
+                    self._draining -= 1
+                    self._room.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every event enqueued so far has been delivered. Once the sink is
+        closed, there is no drainer to wait on, so leftovers are delivered right away.
+        """
+        if not self._drainer.is_alive():
+            self._deliver_all()
+            return True
+        self._ready.set()
+        with self._room:
+            return self._room.wait_for(
+                lambda: not (self._queue or self._draining)
+                or not self._drainer.is_alive(),
+                timeout=timeout,
+            ) and not (self._queue or self._draining)
+
+    def close(self):
+        self._closed.set()
+        self._ready.set()
+        self._drainer.join()
+        with self._room:
+            self._room.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
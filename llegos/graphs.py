@@ -0,0 +1,247 @@
+import typing as t
+
+import numpy as np
+from beartype.typing import Callable, Hashable, Optional, TypeVar
+
+from llegos.research import Object, SceneGraph
+
+T = TypeVar("T")
+
+_MISSING = object()
+_REMOVED = object()
+
+
+def _node_key(node: Hashable) -> Hashable:
+    "Actors are indexed by id, so indexing them never compares whole models."
+    return node.id if isinstance(node, Object) else node
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+class CompactGraph:
+    """
+    A Scene graph backend for scenes with hundreds of thousands of actors and edges.
+
+    Nodes are indexed by integers, and edges are stored as columns: endpoints, weight
+    and liveness in NumPy arrays, any other attributes in lists. Adjacency is compiled
+    into CSR arrays, sorted by weight, on the first query after a change, so build the
+    graph first and query it afterwards.
+
+    Edge keys are edge indices. Edge data is assembled when a node's relationships are
+    first requested, so mutating it in place has no effect; use add_edge instead.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._memo: dict[Hashable, t.Any] = {}
+        self._nodes: list[t.Any] = []
+        self._index: dict[Hashable, int] = {}
+        self._edges = 0
+        self._src = np.zeros(0, dtype=np.int64)
+        self._dst = np.zeros(0, dtype=np.int64)
+        self._weight = np.zeros(0, dtype=np.float64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._columns: dict[str, list] = {}
+        self._keys: dict[int, t.Any] = {}
+
+    def invalidate(self):
+        self.version += 1
+        self._memo = {}
+
+    def memoize(self, key: Hashable, build: Callable[[], T]) -> T:
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = build()
+            return value
+
+    @property
+    def nodes(self) -> list[t.Any]:
+        return [node for node in self._nodes if node is not _REMOVED]
+
+    def __contains__(self, node: Hashable) -> bool:
+        return _node_key(node) in self._index
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        return iter(self.nodes)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def number_of_nodes(self) -> int:
+        return len(self._index)
+
+    def number_of_edges(self) -> int:
+        return int(self._alive[: self._edges].sum())
+
+    def index(self, node: Hashable) -> int:
+        return self._index[_node_key(node)]
+
+    def add_node(self, node: Hashable):
+        self._add_node(node)
+        self.invalidate()
+
+    def add_nodes_from(self, nodes: t.Iterable[Hashable]):
+        for node in nodes:
+            self._add_node(node)
+        self.invalidate()
+
+    def _add_node(self, node: Hashable) -> int:
+        key = _node_key(node)
+        if (index := self._index.get(key)) is None:
+            index = self._index[key] = len(self._nodes)
+            self._nodes.append(node)
+        return index
+
+    def add_edge(self, u: Hashable, v: Hashable, key: t.Any = None, **attr) -> t.Any:
+        edge = self._add_edge(u, v, key, attr)
+        self.invalidate()
+        return self._keys.get(edge, edge)
+
+    def add_edges_from(self, edges: t.Iterable[tuple], **attr):
+        for u, v, *rest in edges:
+            data = {**attr, **(rest[-1] if rest and isinstance(rest[-1], dict) else {})}
+            self._add_edge(u, v, None, data)
+        self.invalidate()
+
+    def add_weighted_edges_from(self, edges: t.Iterable[tuple], weight: str = "weight"):
+        self.add_edges_from((u, v, {weight: w}) for u, v, w in edges)
+
+    def _add_edge(self, u: Hashable, v: Hashable, key: t.Any, attr: dict) -> int:
+        edge = self._edges
+        self._edges += 1
+        size = self._edges
+        self._src = _grow(self._src, size)
+        self._dst = _grow(self._dst, size)
+        self._weight = _grow(self._weight, size)
+        self._alive = _grow(self._alive, size)
+
+        self._src[edge] = self._add_node(u)
+        self._dst[edge] = self._add_node(v)
+        self._weight[edge] = attr.pop("weight", np.nan)
+        self._alive[edge] = True
+        if key is not None:
+            self._keys[edge] = key
+        for name, value in attr.items():
+            column = self._columns.setdefault(name, [])
+            column.extend([_MISSING] * (edge - len(column)))
+            column.append(value)
+        return edge
+
+    def remove_node(self, node: Hashable):
+        index = self._index.pop(_node_key(node))
+        self._nodes[index] = _REMOVED
+        n = self._edges
+        self._alive[:n] &= (self._src[:n] != index) & (self._dst[:n] != index)
+        self.invalidate()
+
+    def remove_nodes_from(self, nodes: t.Iterable[Hashable]):
+        for node in nodes:
+            if node in self:
+                self.remove_node(node)
+
+    def remove_edge(self, u: Hashable, v: Hashable, key: t.Any = None):
+        u, v = self.index(u), self.index(v)
+        n = self._edges
+        between = self._alive[:n] & (
+            ((self._src[:n] == u) & (self._dst[:n] == v))
+            | ((self._src[:n] == v) & (self._dst[:n] == u))
+        )
+        for edge in np.flatnonzero(between)[::-1]:
+            if key is None or self._keys.get(int(edge), int(edge)) == key:
+                self._alive[edge] = False
+                self.invalidate()
+                return
+        raise KeyError((u, v, key))
+
+    def clear(self):
+        self.__init__()
+        self.invalidate()
+
+    def _csr(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every live edge appears once under each of its endpoints (self-loops once),
+        and each node's edges are sorted by descending weight, unweighted edges as 1, and
+        then by insertion.
+        """
+
+        def build():
+            edges = np.flatnonzero(self._alive[: self._edges])
+            src, dst = self._src[edges], self._dst[edges]
+            loops = src == dst
+            heads = np.concatenate([src, dst[~loops]])
+            tails = np.concatenate([dst, src[~loops]])
+            edges = np.concatenate([edges, edges[~loops]])
+            weights = np.nan_to_num(self._weight[edges], nan=1.0)
+            order = np.lexsort((edges, -weights, heads))
+            indptr = np.zeros(len(self._nodes) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(heads, minlength=len(self._nodes)), out=indptr[1:])
+            return indptr, tails[order], edges[order]
+
+        return self.memoize("csr", build)
+
+    def neighbors(self, node: Hashable) -> tuple[np.ndarray, np.ndarray]:
+        "The node's neighbor indices and edge weights, by descending weight."
+        indptr, tails, edges = self._csr()
+        index = self.index(node)
+        span = slice(indptr[index], indptr[index + 1])
+        return tails[span], np.nan_to_num(self._weight[edges[span]], nan=1.0)
+
+    def degree(self, node: Hashable) -> int:
+        indptr, _tails, _edges = self._csr()
+        index = self.index(node)
+        return int(indptr[index + 1] - indptr[index])
+
+    def edge_data(self, edge: int) -> dict:
+        data = {
+            name: column[edge]
+            for name, column in self._columns.items()
+            if edge < len(column) and column[edge] is not _MISSING
+        }
+        if not np.isnan(weight := self._weight[edge]):
+            data["weight"] = weight.item()
+        return data
+
+    def relationships(self, node: Hashable) -> t.Sequence[tuple[t.Any, t.Any, dict]]:
+        "The node's edges as (neighbor, key, data), by descending weight."
+
+        def build():
+            if node not in self:
+                return ()
+            indptr, tails, edges = self._csr()
+            index = self.index(node)
+            span = slice(indptr[index], indptr[index + 1])
+            return tuple(
+                (self._nodes[tail], self._keys.get(edge, edge), self.edge_data(edge))
+                for tail, edge in zip(tails[span].tolist(), edges[span].tolist())
+            )
+
+        return self.memoize(("relationships", _node_key(node)), build)
+
+    def to_networkx(self, graph: Optional[SceneGraph] = None) -> SceneGraph:
+        graph = SceneGraph() if graph is None else graph
+        graph.add_nodes_from(self.nodes)
+        for edge in np.flatnonzero(self._alive[: self._edges]).tolist():
+            graph.add_edge(
+                self._nodes[self._src[edge]],
+                self._nodes[self._dst[edge]],
+                key=self._keys.get(edge, edge),
+                **self.edge_data(edge),
+            )
+        return graph
+
+    @classmethod
+    def from_networkx(cls, graph) -> "CompactGraph":
+        compact = cls()
+        for node in graph.nodes:
+            compact._add_node(node)
+        for u, v, data in graph.edges(data=True):
+            compact._add_edge(u, v, None, dict(data))
+        compact.invalidate()
+        return compact
@@ -0,0 +1,294 @@
+import json
+import sqlite3
+import typing as t
+from datetime import datetime
+from queue import Empty, Queue
+from threading import Lock, Thread
+
+from beartype.typing import Optional
+
+from llegos.research import Actor, Message
+
+_SCHEMA = """
+create table if not exists messages (
+    id text primary key,
+    root_id text not null,
+    parent_id text,
+    sender_id text not null,
+    receiver_id text not null,
+    class text not null,
+    created_at text not null,
+    body text not null
+);
+create index if not exists messages_root on messages (root_id, created_at);
+create index if not exists messages_parent on messages (parent_id);
+create index if not exists messages_sender on messages (sender_id, created_at);
+create index if not exists messages_receiver on messages (receiver_id, created_at);
+create index if not exists messages_class on messages (class, created_at);
+create index if not exists messages_created_at on messages (created_at);
+"""
+
+_COLUMNS = "id, root_id, parent_id, sender_id, receiver_id, class, created_at, body"
+
+_CLOSE = object()
+
+
+class StoredMessage(t.NamedTuple):
+    id: str
+    root_id: str
+    parent_id: Optional[str]
+    sender_id: str
+    receiver_id: str
+    cls: str
+    created_at: datetime
+    body: dict
+    depth: int = (
+        0  # the distance from the queried message, in ancestry and subtree queries
+    )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "StoredMessage":
+        (
+            id,
+            root_id,
+            parent_id,
+            sender_id,
+            receiver_id,
+            name,
+            created_at,
+            body,
+            *depth,
+        ) = row
+        return cls(
+            id,
+            root_id,
+            parent_id,
+            sender_id,
+            receiver_id,
+            name,
+            datetime.fromisoformat(created_at),
+            json.loads(body),
+            *depth,
+        )
+
+
+class MessageHistory:
+    """
+    Persists messages to SQLite for analysing runs after the fact, without holding them
+    in memory or walking parent pointers.
+
+    record() only enqueues the message; a background thread serializes and writes
+    messages in batches, one transaction per batch. Messages are stored as JSON, with
+    their sender, receiver and parent as ids, and indexed by the root of their
+    conversation. Call flush() before querying what was just recorded.
+
+    Messages that fail to serialize or write are counted as failed and skipped, so one
+    bad message never stops the writer.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        roots: int = 65_536,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+        self._max_roots = roots
+        self._roots: dict[str, str] = {}
+        self._queue: Queue = Queue()
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("pragma journal_mode = wal")
+        self._connection.executescript(_SCHEMA)
+        self._writer = Thread(target=self._write, name="llegos.history", daemon=True)
+        self._writer.start()
+
+    def record(self, message: Message):
+        self._queue.put(message)
+
+    def watch(self, *actors: Actor):
+        "Record every message the actors receive."
+        for actor in actors:
+            actor.on("before:receive", self.record)
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_CLOSE)
+        self._writer.join()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            closing = batch[-1] is _CLOSE
+            messages = [message for message in batch if message is not _CLOSE]
+            try:
+                rows = []
+                for message in messages:
+                    try:
+                        rows.append(self._row(message))
+                    except Exception:
+                        self.failed += 1
+                if rows:
+                    self._insert(rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if closing:
+                return
+
+    def _insert(self, rows: list[tuple]):
+        sql = f"insert or ignore into messages ({_COLUMNS}) values (?, ?, ?, ?, ?, ?, ?, ?)"
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(sql, rows)
+        except sqlite3.Error:
+            self.failed += len(rows)
+        else:
+            self.batches += 1
+            self.written += len(rows)
+
+    def _row(self, message: Message) -> tuple:
+        return (
+            message.id,
+            self._root(message),
+            message.parent_id,
+            message.sender_id,
+            message.receiver_id,
+            message.__class__.__name__,
+            message.created_at.isoformat(),
+            message.model_dump_json(exclude={"sender", "receiver", "parent"}),
+        )
+
+    def _root(self, message: Message) -> str:
+        "The id of the conversation's first message, remembering recent conversations."
+        path = []
+        while message.parent is not None and message.id not in self._roots:
+            path.append(message.id)
+            message = message.parent
+        root = self._roots.get(message.id, message.id)
+        for id in (*path, message.id):
+            self._roots[id] = root
+        while len(self._roots) > self._max_roots:
+            del self._roots[next(iter(self._roots))]
+        return root
+
+    def _select(self, sql: str, parameters: t.Sequence = ()) -> list[StoredMessage]:
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [StoredMessage.from_row(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("select count(*) from messages").fetchone()[
+                0
+            ]
+
+    def get(self, id: str) -> Optional[StoredMessage]:
+        rows = self._select(f"select {_COLUMNS} from messages where id = ?", (id,))
+        return rows[0] if rows else None
+
+    def ancestors(self, id: str) -> list[StoredMessage]:
+        "The message's recorded ancestors, nearest first."
+        return self._select(
+            f"""
+            with recursive ancestry (id, depth) as (
+                select parent_id, 1 from messages where id = ?
+                union all
+                select messages.parent_id, ancestry.depth + 1
+                from messages join ancestry on messages.id = ancestry.id
+            )
+            select {_COLUMNS}, ancestry.depth
+            from messages join ancestry using (id)
+            order by ancestry.depth
+            """,
+            (id,),
+        )
+
+    def subtree(self, id: str, max_depth: Optional[int] = None) -> list[StoredMessage]:
+        "The message and its recorded descendants, breadth first."
+        return self._select(
+            f"""
+            with recursive subtree (id, depth) as (
+                select ?, 0
+                union all
+                select messages.id, subtree.depth + 1
+                from messages join subtree on messages.parent_id = subtree.id
+                where ? is null or subtree.depth < ?
+            )
+            select {_COLUMNS}, subtree.depth
+            from messages join subtree using (id)
+            order by subtree.depth, messages.created_at
+            """,
+            (id, max_depth, max_depth),
+        )
+
+    def conversation(self, root_id: str) -> list[StoredMessage]:
+        return self._select(
+            f"select {_COLUMNS} from messages where root_id = ? order by created_at",
+            (root_id,),
+        )
+
+    def query(
+        self,
+        sender: Optional[str | Actor] = None,
+        receiver: Optional[str | Actor] = None,
+        cls: Optional[str | type[Message]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> list[StoredMessage]:
+        clauses, parameters = [], []
+        for column, value in (
+            ("sender_id", sender),
+            ("receiver_id", receiver),
+            ("class", cls),
+        ):
+            match value:
+                case None:
+                    continue
+                case Actor():
+                    value = value.id
+                case type():
+                    value = value.__name__
+            clauses.append(f"{column} = ?")
+            parameters.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            parameters.append(since.isoformat())
+        if until is not None:
+            clauses.append("created_at < ?")
+            parameters.append(until.isoformat())
+
+        sql = f"select {_COLUMNS} from messages"
+        if clauses:
+            sql += " where " + " and ".join(clauses)
+        sql += " order by created_at"
+        if limit is not None:
+            sql += " limit ?"
+            parameters.append(limit)
+        return self._select(sql, parameters)
@@ -0,0 +1,201 @@
+import json
+import socketserver
+import typing as t
+from contextvars import copy_context
+from queue import Empty, Queue
+from threading import Lock, Thread
+
+from beartype.typing import Callable, Iterator, Optional
+from pydantic import Field, PrivateAttr
+
+from llegos.research import (
+    Actor,
+    Message,
+    Scene,
+    message_propogate,
+    message_send,
+    scene_context,
+)
+
+
+class NotParked(ValueError):
+    ...
+
+
+class Human(Actor):
+    """
+    A person in the loop. Instead of blocking on their input, the handler parks the
+    conversation and returns at once, so waiting on people holds no threads.
+    respond() later resumes the conversation, from whichever scenes it was parked in.
+
+    Replies are of the same class as the message they answer, unless reply_class()
+    says otherwise, and text input sets their text_field.
+    """
+
+    text_field: str = Field(default="content")
+    _parked: dict[str, tuple[Message, tuple[Scene, ...]]] = PrivateAttr(
+        default_factory=dict
+    )
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
+    def can_receive(self, message: Message | type[Message]) -> bool:
+        "People can answer anything, so any message class, or message addressed to them."
+        if isinstance(message, Message):
+            return message.receiver == self
+        return issubclass(message, Message)
+
+    def receive_missing(self, message: Message):
+        with self._lock:
+            self._parked[message.id] = (message, scene_context.get())
+        self.emit("parked", message)
+
+    @property
+    def parked(self) -> list[Message]:
+        with self._lock:
+            return [message for message, _scenes in self._parked.values()]
+
+    def is_parked(self, message_id: str) -> bool:
+        return message_id in self._parked
+
+    def reply_class(self, message: Message) -> type[Message]:
+        return message.__class__
+
+    def respond(
+        self,
+        message_id: str,
+        applicator: Callable[[Message], Iterator[Message]] = message_send,
+        **fields,
+    ) -> Iterator[Message]:
+        """
+        Reply to a parked message, and carry the conversation on from there, yielding
+        the reply and everything that follows, until it ends or parks again.
+        """
+        with self._lock:
+            try:
+                message, scenes = self._parked.pop(message_id)
+            except KeyError:
+                raise NotParked(message_id) from None
+
+        reply = self.reply_class(message).reply_to(message, **fields)
+        self.emit("resumed", reply)
+        return self._resume(reply, scenes, applicator)
+
+    @staticmethod
+    def _resume(
+        reply: Message,
+        scenes: tuple[Scene, ...],
+        applicator: Callable[[Message], Iterator[Message]],
+    ) -> Iterator[Message]:
+        """
+        The conversation carries on in a context of its own, entered for each step, so
+        the parked scenes never leak into the caller's between yields.
+        """
+        context = copy_context()
+        context.run(scene_context.set, scenes)
+        replies = message_propogate(reply, applicator)
+        try:
+            yield reply
+            while True:
+                try:
+                    yield context.run(next, replies)
+                except StopIteration:
+                    return
+        finally:
+            context.run(replies.close)
+
+
+class Desk:
+    """
+    Delivers input from people to whichever human its message is parked with, from
+    any source: lines of text from a console, a local socket, or items on a queue.
+
+    Each delivery resumes its conversation on the delivering thread, and every message
+    that follows is passed to on_message.
+    """
+
+    def __init__(
+        self,
+        *humans: Human,
+        on_message: Optional[Callable[[Message], t.Any]] = None,
+        applicator: Callable[[Message], Iterator[Message]] = message_send,
+    ):
+        self.humans = list(humans)
+        self.on_message = on_message
+        self.applicator = applicator
+
+    def add(self, human: Human):
+        self.humans.append(human)
+
+    def human(self, message_id: str) -> Human:
+        for human in self.humans:
+            if human.is_parked(message_id):
+                return human
+        raise NotParked(message_id)
+
+    def deliver(self, message_id: str, **fields) -> list[Message]:
+        messages = []
+        for message in self.human(message_id).respond(
+            message_id, self.applicator, **fields
+        ):
+            messages.append(message)
+            if self.on_message:
+                self.on_message(message)
+        return messages
+
+    def deliver_line(self, line: str) -> list[Message]:
+        """
+        A line is either a JSON object with the parked message's id and the reply's
+        fields, or the message id followed by the reply's text.
+        """
+        line = line.strip()
+        if line.startswith("{"):
+            fields = json.loads(line)
+            return self.deliver(fields.pop("id"), **fields)
+        message_id, _, text = line.partition(" ")
+        return self.deliver(message_id, **{self.human(message_id).text_field: text})
+
+    def feed(self, lines: t.Iterable[str]):
+        "Deliver every line, say from sys.stdin, until the input ends."
+        for line in lines:
+            if line.strip():
+                self.deliver_line(line)
+
+    def pump(self, queue: Queue) -> int:
+        """
+        Deliver everything on the queue without blocking, either lines of text or
+        (message id, fields) pairs, and return how many were delivered.
+        """
+        delivered = 0
+        while True:
+            try:
+                item = queue.get_nowait()
+            except Empty:
+                return delivered
+            match item:
+                case str():
+                    self.deliver_line(item)
+                case (message_id, dict() as fields):
+                    self.deliver(message_id, **fields)
+            delivered += 1
+
+    def serve(self, path: str) -> socketserver.UnixStreamServer:
+        """
+        Accept lines on a Unix socket at path, and answer each with a JSON line: the
+        messages that followed it, or an error. Call shutdown() on the result to stop.
+        """
+        desk = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        messages = desk.deliver_line(line.decode())
+                        response = [json.loads(str(message)) for message in messages]
+                    except (NotParked, ValueError, KeyError) as error:
+                        response = {"error": f"{error.__class__.__name__}: {error}"}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        Thread(target=server.serve_forever, name="llegos.human", daemon=True).start()
+        return server
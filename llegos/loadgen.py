@@ -0,0 +1,364 @@
+"""
+Drives synthetic scenes at a target concurrency or message rate, and reports
+throughput, latency percentiles and memory over time.
+
+    llegos-loadgen star --actors 100 --latency 0.01 --concurrency 32 --duration 10
+    llegos-loadgen tree --fanout 4 --depth 3 --rate 200 --json
+"""
+
+import argparse
+import os
+import random
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from threading import Event, Lock, Thread
+from time import perf_counter, sleep
+
+import networkx as nx
+from beartype.typing import Callable, Optional
+from pydantic import BaseModel, Field
+
+from llegos.concurrency import message_gather
+from llegos.map_reduce import Combine, MapReduce
+from llegos.research import Actor, Message, Scene, message_send
+
+
+class Work(Message):
+    ...
+
+
+class Result(Message):
+    units: int = Field(default=1, description="How many workers contributed")
+
+
+def _units(message: Message) -> int:
+    return sum(result.units for result in message_send(message))
+
+
+class Worker(Actor):
+    latency: float = Field(default=0.0, description="Simulated I/O, like a model call")
+    cpu: float = Field(
+        default=0.0, description="Simulated CPU-bound work, holding the GIL"
+    )
+    jitter: float = Field(default=0.0, ge=0.0, le=1.0)
+
+    def receive_work(self, work: Work):
+        scale = random.uniform(1 - self.jitter, 1 + self.jitter)
+        if self.latency:
+            sleep(self.latency * scale)
+        if self.cpu:
+            until = perf_counter() + self.cpu * scale
+            while perf_counter() < until:
+                pass
+        return Result.reply_to(work)
+
+
+class Star(Scene):
+    "A hub dispatching each request to one worker."
+
+    def receive_work(self, work: Work):
+        with self:
+            (worker,) = self.sample_receivers(Work)
+        return Result.reply_to(work, units=_units(work.forward_to(worker)))
+
+
+class Tree(MapReduce):
+    "A map-reduce tree, whose inner nodes fan each request out to their children."
+
+    def receive_work(self, work: Work):
+        result = self.map_reduce(work)
+        return Result.reply_to(work, units=result.units if result else 0)
+
+    def receive_combine(self, message: Combine) -> Result:
+        left, right = message.left, message.right
+        return Result.reply_to(left.parent, units=left.units + right.units)
+
+
+class Debate(Scene):
+    "Debaters take turns on each request, for a number of rounds."
+
+    rounds: int = Field(default=3, ge=1)
+
+    def receive_work(self, work: Work):
+        units = sum(
+            _units(work.forward_to(debater))
+            for _ in range(self.rounds)
+            for debater in self.actors
+        )
+        return Result.reply_to(work, units=units)
+
+
+class ContractNet(Scene):
+    "Every contractor bids on each request concurrently, and the first bidder is awarded it."
+
+    quorum: Optional[int] = None
+
+    def receive_work(self, work: Work):
+        gathering = message_gather(work, receivers=self.actors, quorum=self.quorum)
+        if not gathering.replies:
+            return Result.reply_to(work, units=0)
+        winner = gathering.replies[0].sender
+        return Result.reply_to(
+            work, units=len(gathering.replies) + _units(work.forward_to(winner))
+        )
+
+
+class RandomGraph(Scene):
+    "Each request takes a random walk through a random graph of workers."
+
+    hops: int = Field(default=3, ge=1)
+
+    def receive_work(self, work: Work):
+        units = 0
+        with self:
+            actor = random.choice(self.actors)
+            for _ in range(self.hops):
+                units += _units(work.forward_to(actor))
+                neighbors = [n for n in actor.receivers(Work) if n is not self]
+                if not neighbors:
+                    break
+                actor = random.choice(neighbors)
+        return Result.reply_to(work, units=units)
+
+
+def _workers(options: argparse.Namespace, n: int) -> list[Worker]:
+    return [
+        Worker(latency=options.latency, cpu=options.cpu, jitter=options.jitter)
+        for _ in range(n)
+    ]
+
+
+def _tree(options: argparse.Namespace, depth: int) -> Tree:
+    if depth <= 1:
+        children = _workers(options, options.fanout)
+    else:
+        children = [_tree(options, depth - 1) for _ in range(options.fanout)]
+    return Tree(actors=children, max_workers=options.fanout)
+
+
+def _random_graph(options: argparse.Namespace) -> RandomGraph:
+    workers = _workers(options, options.actors)
+    scene = RandomGraph(actors=workers, hops=options.hops)
+    graph = nx.gnp_random_graph(
+        len(workers), options.edge_probability, seed=options.seed
+    )
+    for u, v in graph.edges:
+        scene._graph.add_edge(workers[u], workers[v])
+    return scene
+
+
+topologies: dict[str, Callable[[argparse.Namespace], Actor]] = {
+    "star": lambda options: Star(actors=_workers(options, options.actors)),
+    "tree": lambda options: _tree(options, options.depth),
+    "debate": lambda options: Debate(
+        actors=_workers(options, options.actors), rounds=options.rounds
+    ),
+    "contract-net": lambda options: ContractNet(
+        actors=_workers(options, options.actors), quorum=options.quorum
+    ),
+    "random": _random_graph,
+}
+
+
+class MemorySample(BaseModel):
+    seconds: float
+    bytes: int
+
+
+class LoadReport(BaseModel):
+    topology: str
+    requests: int
+    errors: int
+    units: int = Field(description="Worker messages handled")
+    seconds: float
+    latencies: dict[str, float] = Field(description="Latency percentiles, in seconds")
+    memory: list[MemorySample]
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        latencies = "  ".join(
+            f"{p} {s * 1000:.2f}ms" for p, s in self.latencies.items()
+        )
+        memory = [sample.bytes / 2**20 for sample in self.memory] or [0.0]
+        return "\n".join(
+            [
+                f"topology    {self.topology}",
+                f"requests    {self.requests} ({self.errors} errors, {self.units} worker "
+                f"messages) in {self.seconds:.2f}s, {self.throughput:.1f}/s",
+                f"latency     {latencies}",
+                f"memory      start {memory[0]:.1f}MB  peak {max(memory):.1f}MB  "
+                f"end {memory[-1]:.1f}MB",
+            ]
+        )
+
+
+def resident_memory() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {}
+    latencies = sorted(latencies)
+
+    def at(p: float) -> float:
+        return latencies[min(round(p / 100 * (len(latencies) - 1)), len(latencies) - 1)]
+
+    return {"p50": at(50), "p90": at(90), "p99": at(99), "max": latencies[-1]}
+
+
+def drive(
+    root: Actor,
+    topology: str = "custom",
+    duration: float = 10.0,
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    requests: Optional[int] = None,
+    memory_interval: float = 0.5,
+) -> LoadReport:
+    """
+    Sends Work to the root until the duration elapses or the requests are sent.
+
+    Without a rate, concurrency senders each send the next request as soon as the last
+    is answered. With a rate, requests are sent on schedule by up to concurrency
+    threads, and latency is measured from when each request was due, so that a
+    backlog shows up in the latencies instead of lowering the rate.
+    """
+    sender = Actor()
+    latencies: list[float] = []
+    memory: list[MemorySample] = []
+    totals = {"requests": 0, "errors": 0, "units": 0}
+    lock = Lock()
+    stop = Event()
+    started = perf_counter()
+
+    def claim() -> bool:
+        with lock:
+            if stop.is_set() or (
+                requests is not None and totals["requests"] >= requests
+            ):
+                return False
+            totals["requests"] += 1
+            return True
+
+    def send(due: float):
+        try:
+            units = _units(Work(sender=sender, receiver=root))
+        except Exception:
+            with lock:
+                totals["errors"] += 1
+            return
+        latency = perf_counter() - due
+        with lock:
+            latencies.append(latency)
+            totals["units"] += units
+
+    def closed_loop():
+        while claim():
+            send(perf_counter())
+
+    def sample_memory():
+        while not stop.wait(memory_interval):
+            memory.append(
+                MemorySample(seconds=perf_counter() - started, bytes=resident_memory())
+            )
+
+    memory.append(MemorySample(seconds=0.0, bytes=resident_memory()))
+    sampler = Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    timer = Thread(target=lambda: stop.wait(duration) or stop.set(), daemon=True)
+    timer.start()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        if rate is None:
+            for _ in range(concurrency):
+                pool.submit(closed_loop)
+        else:
+            for i in count():
+                due = started + i / rate
+                if stop.wait(max(due - perf_counter(), 0)) or not claim():
+                    break
+                pool.submit(send, due)
+
+    stop.set()
+    seconds = perf_counter() - started
+    memory.append(MemorySample(seconds=seconds, bytes=resident_memory()))
+    return LoadReport(
+        topology=topology,
+        seconds=seconds,
+        latencies=percentiles(latencies),
+        memory=memory,
+        **totals,
+    )
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="llegos-loadgen", description=__doc__.split("\n\n")[0].strip()
+    )
+    parser.add_argument("topology", choices=sorted(topologies))
+
+    shape = parser.add_argument_group("topology")
+    shape.add_argument(
+        "--actors", type=int, default=16, help="workers, for flat topologies"
+    )
+    shape.add_argument("--fanout", type=int, default=4, help="children per tree node")
+    shape.add_argument("--depth", type=int, default=2, help="levels of the tree")
+    shape.add_argument(
+        "--rounds", type=int, default=3, help="debate rounds per request"
+    )
+    shape.add_argument("--quorum", type=int, default=None, help="bids to wait for")
+    shape.add_argument("--hops", type=int, default=3, help="random walk length")
+    shape.add_argument("--edge-probability", type=float, default=0.2)
+    shape.add_argument("--seed", type=int, default=None)
+
+    cost = parser.add_argument_group("workers")
+    cost.add_argument(
+        "--latency", type=float, default=0.001, help="seconds of simulated I/O"
+    )
+    cost.add_argument(
+        "--cpu", type=float, default=0.0, help="seconds of simulated CPU work"
+    )
+    cost.add_argument(
+        "--jitter", type=float, default=0.0, help="relative spread of costs"
+    )
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--rate", type=float, default=None, help="requests per second")
+    load.add_argument("--duration", type=float, default=10.0, help="seconds")
+    load.add_argument("--requests", type=int, default=None, help="stop after this many")
+    load.add_argument("--memory-interval", type=float, default=0.5, help="seconds")
+    load.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def main(argv: Optional[t.Sequence[str]] = None):
+    options = parser().parse_args(argv)
+    if options.seed is not None:
+        random.seed(options.seed)
+
+    report = drive(
+        topologies[options.topology](options),
+        topology=options.topology,
+        duration=options.duration,
+        concurrency=options.concurrency,
+        rate=options.rate,
+        requests=options.requests,
+        memory_interval=options.memory_interval,
+    )
+    print(report.model_dump_json(indent=2) if options.json else report)
+
+
+if __name__ == "__main__":
+    main()
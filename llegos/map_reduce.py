@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from functools import reduce
+
+from beartype.typing import Iterator, Optional, Sequence
+from pydantic import Field
+
+from llegos.research import Actor, Message, Scene, message_send
+
+
+class Combine(Message):
+    left: Message
+    right: Message
+
+
+class MapReduce(Scene, ABC):
+    """
+    Fans a message out to its mappers concurrently, and folds their replies together
+    as they arrive, instead of waiting for the slowest mapper. Each pair of partial
+    results is sent to the scene itself as a Combine, for receive_combine() to reply
+    with their combination.
+
+    Combining must be associative, and since replies arrive in any order, commutative.
+    With tree=True, partial results are combined pairwise in parallel, which pays off
+    for large fan-outs with expensive combines. Reduction stops early as soon as a
+    partial result is good_enough().
+    """
+
+    max_workers: int = Field(default=8, ge=1)
+    tree: bool = Field(default=False)
+
+    def mappers(self, message: Message) -> Sequence[Actor]:
+        return self.receivers(message.__class__)
+
+    @abstractmethod
+    def receive_combine(self, message: Combine) -> Message:
+        ...
+
+    def combine(self, left: Message, right: Message) -> Message:
+        (combined,) = message_send(
+            Combine(sender=self, receiver=self, left=left, right=right)
+        )
+        return combined
+
+    def good_enough(self, partial: Message) -> bool:
+        return False
+
+    def map_reduce(self, message: Message) -> Optional[Message]:
+        with self:
+            executor = ThreadPoolExecutor(self.max_workers)
+            try:
+                return self._map_reduce(message, executor)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _map(self, message: Message, mapper: Actor) -> list[Message]:
+        return [reply for reply in message_send(message.forward_to(mapper)) if reply]
+
+    def _combine(self, left: Message, right: Message) -> list[Message]:
+        return [self.combine(left, right)]
+
+    def _map_reduce(self, message: Message, executor: Executor) -> Optional[Message]:
+        pending = {
+            executor.submit(copy_context().run, self._map, message, mapper)
+            for mapper in self.mappers(message)
+        }
+        partials: list[Message] = []
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for partial in self._arrivals(done):
+                if self.good_enough(partial):
+                    return partial
+                partials.append(partial)
+
+            if self.tree:
+                while len(partials) >= 2:
+                    left, right = partials.pop(), partials.pop()
+                    pending.add(
+                        executor.submit(copy_context().run, self._combine, left, right)
+                    )
+            elif len(partials) >= 2:
+                partials = [reduce(self.combine, partials)]
+                if self.good_enough(partials[0]):
+                    return partials[0]
+
+        return partials[0] if partials else None
+
+    @staticmethod
+    def _arrivals(done) -> Iterator[Message]:
+        for future in done:
+            yield from future.result()
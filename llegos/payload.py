@@ -0,0 +1,176 @@
+import json
+import mmap
+import typing as t
+from hashlib import blake2b
+from multiprocessing.shared_memory import SharedMemory
+from os import PathLike
+from weakref import WeakValueDictionary
+
+import numpy as np
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+from llegos.research import serializable_as_extra
+
+
+class UnknownPayload(ValueError):
+    ...
+
+
+# Payloads whose digest has been computed, so that references to them can be resolved
+# when messages are deserialized within the same process.
+payloads: WeakValueDictionary[str, "Payload"] = WeakValueDictionary()
+
+
+@serializable_as_extra
+class Payload:
+    """
+    An immutable buffer that messages share by reference instead of copying.
+
+    Replying to or forwarding a message carries its payloads over as-is. In JSON, like
+    logs and transports, a payload is a reference to its content hash, and with share()
+    it can be handed to actors in other processes through shared memory.
+    """
+
+    def __init__(
+        self,
+        data: bytes | bytearray | memoryview | mmap.mmap | np.ndarray,
+        dtype: t.Optional[np.dtype] = None,
+        shape: t.Optional[tuple[int, ...]] = None,
+    ):
+        match data:
+            case np.ndarray():
+                array = np.ascontiguousarray(data).view()
+                array.flags.writeable = False
+                dtype, shape, data = array.dtype, array.shape, array
+            case bytearray():
+                data = bytes(data)
+
+        self._view = memoryview(data).cast("B").toreadonly()
+        self._dtype = dtype
+        self._shape = shape
+        self._digest: t.Optional[str] = None
+        self._shm: t.Optional[SharedMemory] = None
+
+    @classmethod
+    def from_file(cls, path: str | PathLike) -> "Payload":
+        "Memory-map a file, read-only."
+        with open(path, "rb") as file:
+            try:
+                return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:  # empty files cannot be mapped
+                return cls(b"")
+
+    @classmethod
+    def from_json(cls, value: t.Any) -> "Payload":
+        return cls(json.dumps(value).encode())
+
+    def json(self) -> t.Any:
+        return json.loads(self._view.tobytes())
+
+    @property
+    def view(self) -> memoryview:
+        return self._view
+
+    def array(self) -> np.ndarray:
+        "A read-only NumPy view of the payload, without copying it."
+        array = np.frombuffer(self._view, dtype=self._dtype or np.uint8)
+        return array.reshape(self._shape) if self._shape is not None else array
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = blake2b(self._view, digest_size=16).hexdigest()
+            payloads.setdefault(self._digest, self)
+        return self._digest
+
+    def reference(self) -> dict[str, t.Any]:
+        reference = {"digest": self.digest, "size": len(self)}
+        if self._shm is not None:
+            reference["shm"] = self._shm.name
+        return reference
+
+    def __len__(self):
+        return self._view.nbytes
+
+    def __bytes__(self):
+        return self._view.tobytes()
+
+    def __eq__(self, other: t.Any):
+        if not isinstance(other, Payload):
+            return NotImplemented
+        return self is other or self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"Payload(size={len(self)}, digest={self.digest!r})"
+
+    def share(self) -> "Payload":
+        """
+        Copy the payload into shared memory once. The shared payload pickles to a
+        reference, so sending it to other processes doesn't copy it again.
+
+        The sharing process owns the memory, and must unlink() it when done.
+        """
+        if self._shm is not None:
+            return self
+        shm = SharedMemory(create=True, size=max(len(self), 1))
+        shm.buf[: len(self)] = self._view
+        return Payload._attach(shm, len(self), self._dtype, self._shape, self._digest)
+
+    @classmethod
+    def _attach(cls, shm: SharedMemory, size: int, dtype, shape, digest) -> "Payload":
+        payload = cls(shm.buf[:size], dtype=dtype, shape=shape)
+        payload._shm = shm
+        payload._digest = digest
+        return payload
+
+    def close(self):
+        if self._shm is not None:
+            self._view.release()
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self.close()
+            self._shm.unlink()
+
+    def __reduce__(self):
+        if self._shm is not None:
+            return (
+                _attach_shared,
+                (self._shm.name, len(self), self._dtype, self._shape, self._digest),
+            )
+        return (Payload, (bytes(self), self._dtype, self._shape))
+
+    @classmethod
+    def _validate(cls, value: t.Any) -> "Payload":
+        match value:
+            case Payload():
+                return value
+            case bytes() | bytearray() | memoryview() | np.ndarray():
+                return cls(value)
+            case {"digest": str(digest)}:
+                if payload := payloads.get(digest):
+                    return payload
+                if name := value.get("shm"):
+                    return _attach_shared(name, value["size"], None, None, digest)
+                raise UnknownPayload(digest)
+        raise ValueError("Payload accepts bytes, arrays or a payload reference", value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: t.Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda payload: payload.reference(), when_used="json"
+            ),
+        )
+
+
+def _attach_shared(name: str, size: int, dtype, shape, digest) -> Payload:
+    return Payload._attach(SharedMemory(name=name), size, dtype, shape, digest)
@@ -0,0 +1,195 @@
+import sys
+import threading
+import typing as t
+from collections import Counter, defaultdict
+from os import path
+from pathlib import Path
+from time import perf_counter
+
+from beartype.typing import Optional
+
+from llegos.research import Actor, Message, Scene
+
+_STREAM = Actor.stream.__code__  # send and message_send both go through stream
+
+
+class ActorProfile(t.NamedTuple):
+    actor: str
+    actor_id: str
+    handler: str
+    message_class: str
+    scene_id: Optional[str]
+    self_seconds: float
+    total_seconds: float
+    samples: int
+
+
+def _thread_cpu(native_id: int) -> Optional[float]:
+    "The thread's CPU time in seconds, on Linux."
+    try:
+        with open(f"/proc/self/task/{native_id}/schedstat") as schedstat:
+            return int(schedstat.read().split()[0]) / 1e9
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack on an interval, and attributes the samples to the
+    actor, handler and message class being handled, found in Actor.stream frames on the
+    stack, and to the scene of the nearest enclosing scene's handler.
+
+    On Linux, each sample is weighted by the CPU time its thread used since the last
+    one, so threads waiting on I/O or locks cost nothing; elsewhere, by wall time.
+    Sampling costs a stack walk per thread per interval, nothing on the send path.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = 0
+        self.seconds = 0.0
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._actors: defaultdict[tuple, list] = defaultdict(lambda: [0.0, 0.0, 0])
+        self._cpu: dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="llegos.profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self):
+        started = perf_counter()
+        last = started
+        while not self._stop.wait(self.interval):
+            now = perf_counter()
+            self.sample(now - last)
+            last = now
+        self.seconds += perf_counter() - started
+
+    def sample(self, elapsed: float):
+        "Take one sample of every other thread, weighting wall time by elapsed seconds."
+        native_ids = {
+            thread.ident: thread.native_id for thread in threading.enumerate()
+        }
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            weight = self._weight(native_ids.get(ident), elapsed)
+            if weight > 0:
+                self._record(frame, weight)
+        self.samples += 1
+
+    def _weight(self, native_id: Optional[int], elapsed: float) -> float:
+        if native_id is None or (cpu := _thread_cpu(native_id)) is None:
+            return elapsed
+        previous = self._cpu.get(native_id)
+        self._cpu[native_id] = cpu
+        return 0.0 if previous is None else cpu - previous
+
+    def _record(self, frame, weight: float):
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+
+        stack = []
+        handlers = []
+        scene = None
+        for frame in frames:
+            if frame.f_code is not _STREAM:
+                stack.append(_label(frame))
+                continue
+            actor = frame.f_locals.get("self")
+            message = frame.f_locals.get("message")
+            if not isinstance(actor, Actor) or not isinstance(message, Message):
+                continue
+            handler = actor.receive_method_name(message.__class__)
+            if not hasattr(actor, handler):
+                handler = "receive_missing"
+            key = (
+                actor.__class__.__name__,
+                actor.id,
+                handler,
+                message.__class__.__name__,
+                scene.id if scene else None,
+            )
+            handlers.append(key)
+            stack.append(f"[{key[0]}] {handler}({key[3]})")
+            if isinstance(actor, Scene):
+                scene = actor
+
+        self._stacks[tuple(stack)] += weight
+        for key in set(handlers):
+            self._actors[key][1] += weight
+            self._actors[key][2] += 1
+        if handlers:
+            self._actors[handlers[-1]][0] += weight
+
+    def collapsed(self) -> str:
+        """
+        Stacks in the collapsed format of flamegraph.pl, speedscope and friends, one
+        "root;...;leaf microseconds" line per stack.
+        """
+        return "\n".join(
+            f"{';'.join(stack)} {round(seconds * 1e6)}"
+            for stack, seconds in self._stacks.most_common()
+            if round(seconds * 1e6) > 0
+        )
+
+    def write_collapsed(self, path: str | Path):
+        Path(path).write_text(self.collapsed() + "\n")
+
+    def table(self) -> list[ActorProfile]:
+        "Time per actor and handler, most time spent in the handler itself first."
+        return sorted(
+            (
+                ActorProfile(*key, self_seconds, total_seconds, samples)
+                for key, (self_seconds, total_seconds, samples) in self._actors.items()
+            ),
+            key=lambda row: (row.self_seconds, row.total_seconds),
+            reverse=True,
+        )
+
+    def format_table(self, limit: int = 20) -> str:
+        rows = [("actor", "handler", "message", "self", "total", "samples")]
+        for row in self.table()[:limit]:
+            rows.append(
+                (
+                    f"{row.actor} {row.actor_id}",
+                    row.handler,
+                    row.message_class,
+                    f"{row.self_seconds * 1000:.1f}ms",
+                    f"{row.total_seconds * 1000:.1f}ms",
+                    str(row.samples),
+                )
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            for row in rows
+        )
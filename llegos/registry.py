@@ -0,0 +1,261 @@
+import typing as t
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from weakref import WeakValueDictionary, ref
+
+from beartype.typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from llegos.research import Actor, Chunk, Message, Scene, ranked_by_weight
+
+
+class ActorDescriptor(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: str
+    cls: type[Actor]
+    config: dict = Field(default_factory=dict)
+    state: Optional[dict] = Field(
+        default=None, description="The actor's fields when it was last hibernated"
+    )
+
+    def can_receive(self, message_class: type[Message]) -> bool:
+        return hasattr(self.cls, self.cls.receive_method_name(message_class))
+
+    def materialize(self) -> Actor:
+        if self.state is not None:
+            return self.cls(**self.state)
+        return self.cls(id=self.id, **self.config)
+
+
+class Directory(Mapping):
+    "Like Scene.directory, from id to actor, but only materializes the actors looked up."
+
+    __slots__ = ("scene",)
+
+    def __init__(self, scene: "LazyScene"):
+        self.scene = scene
+
+    def __getitem__(self, id: str) -> Actor:
+        return self.scene.materialize(id)
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self.scene.descriptors)
+
+    def __len__(self) -> int:
+        return len(self.scene.descriptors)
+
+    def __contains__(self, id: t.Any) -> bool:
+        return id in self.scene.descriptors
+
+
+class LazyScene(Scene):
+    """
+    A Scene of actor descriptors, for simulations with too many actors to construct up
+    front. Actors are constructed the first time they are looked up or routed to, and
+    at most capacity of them are kept alive: the least recently used idle actors are
+    hibernated, their fields kept in their descriptor until they are needed again.
+
+    Relationships are between actor ids, so relate() never constructs an actor, and
+    receivers are filtered by class before any are constructed. The scene relates to
+    every actor registered in it.
+    """
+
+    capacity: int = Field(default=10_000, ge=1)
+    _descriptors: dict[str, ActorDescriptor] = PrivateAttr(default_factory=dict)
+    _materialized: OrderedDict[str, Actor] = PrivateAttr(default_factory=OrderedDict)
+    _hibernated: WeakValueDictionary[str, Actor] = PrivateAttr(
+        default_factory=WeakValueDictionary
+    )
+    _busy: defaultdict[str, int] = PrivateAttr(default_factory=lambda: defaultdict(int))
+    _materializations: int = PrivateAttr(default=0)
+    _hibernations: int = PrivateAttr(default=0)
+
+    def __init__(self, actors: t.Sequence[Actor] = (), **kwargs):
+        super().__init__(actors=[], **kwargs)
+        for actor in actors:
+            self.adopt(actor)
+
+    def register(self, cls: type[Actor], id: Optional[str] = None, **config) -> str:
+        if id is None:
+            id = cls.model_fields["id"].default_factory()
+        self._descriptors[id] = ActorDescriptor(id=id, cls=cls, config=config)
+        self._graph.invalidate()
+        return id
+
+    def adopt(self, actor: Actor) -> Actor:
+        "Register an actor that has already been constructed."
+        self._descriptors[actor.id] = ActorDescriptor(id=actor.id, cls=actor.__class__)
+        self._graph.invalidate()
+        return self._admit(actor)
+
+    def relate(self, a: str | Actor, b: str | Actor, **data):
+        self._graph.add_edge(_key(a), _key(b), **data)
+
+    def __getitem__(self, key: str | Actor | t.Any) -> Actor:
+        match key:
+            case str():
+                return self.materialize(key)
+            case _:
+                raise TypeError("__getitem__ accepts a key of str", key)
+
+    def __contains__(self, key: str | Actor | t.Any) -> bool:
+        match key:
+            case str():
+                return key in self._descriptors
+            case Actor():
+                return key.id in self._descriptors
+            case _:
+                raise TypeError("__contains__ accepts a key of str or Actor", key)
+
+    def __len__(self) -> int:
+        return len(self._descriptors)
+
+    @property
+    def directory(self) -> Directory:
+        return Directory(self)
+
+    @property
+    def descriptors(self) -> dict[str, ActorDescriptor]:
+        return self._descriptors
+
+    @property
+    def materialized(self) -> t.Sequence[Actor]:
+        return list(self._materialized.values())
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "registered": len(self._descriptors),
+            "materialized": len(self._materialized),
+            "materializations": self._materializations,
+            "hibernations": self._hibernations,
+        }
+
+    def materialize(self, id: str) -> Actor:
+        if actor := self._materialized.get(id):
+            self._materialized.move_to_end(id)
+            return actor
+        if actor := self._hibernated.pop(id, None):
+            return self._admit(actor)
+        actor = self._descriptors[id].materialize()
+        self._materializations += 1
+        return self._admit(actor)
+
+    def hibernate(self, id: str):
+        """
+        Older messages can still refer to a hibernated actor, which keeps it alive. Until
+        it is collected, it is restored rather than reconstructed, so there is only ever
+        one instance per id.
+        """
+        actor = self._materialized.pop(id)
+        self._descriptors[id].state = actor.model_dump()
+        self._hibernated[id] = actor
+        self._hibernations += 1
+
+    def _admit(self, actor: Actor) -> Actor:
+        self._materialized[actor.id] = actor
+        self._descriptors[actor.id].state = None
+        self._track(actor)
+        self._evict()
+        return actor
+
+    def _track(self, actor: Actor):
+        """
+        Wrap the actor's stream, which both send and message_send go through, so it is
+        busy for as long as it handles a message, however the handler ends.
+        """
+        if "stream" in actor.__dict__:
+            return
+        scene, actor_ref, stream = self, ref(actor), actor.__class__.stream
+
+        def tracked(message: Message) -> t.Iterator[Message | Chunk]:
+            actor = scene._enter(actor_ref())
+            try:
+                yield from stream(actor, message)
+            finally:
+                scene._exit(actor)
+
+        object.__setattr__(actor, "stream", tracked)
+
+    def _enter(self, actor: Actor) -> Actor:
+        """
+        Messages can still reach a hibernated actor through older messages that refer
+        to it, in which case it is readmitted rather than reconstructed. Messages that
+        reach an instance replaced by adopt() are redirected to the live one.
+        """
+        live = self._materialized.get(actor.id)
+        if live is None:
+            self._hibernated.pop(actor.id, None)
+            self._busy[actor.id] += 1
+            self._admit(actor)
+            return actor
+        self._busy[actor.id] += 1
+        self._materialized.move_to_end(actor.id)
+        return live
+
+    def _exit(self, actor: Actor):
+        self._busy[actor.id] -= 1
+        if not self._busy[actor.id]:
+            del self._busy[actor.id]
+
+    def _evict(self):
+        materialized = self._materialized
+        excess = len(materialized) - self.capacity
+        if excess <= 0:
+            return
+        busy = self._busy
+        idle = []
+        for id in materialized:  # least recently used first
+            if id not in busy:
+                idle.append(id)
+                if len(idle) == excess:
+                    break
+        for id in idle:
+            self.hibernate(id)
+
+    def _neighbors(self, actor: Actor) -> t.Sequence[tuple[str, t.Any, dict]]:
+        if actor is self:
+            return tuple((id, None, {}) for id in self._descriptors)
+        if actor.id not in self._graph:
+            return ()
+        return self._graph.relationships(actor.id)
+
+    def relationships_of(self, actor: Actor) -> t.Sequence[tuple[Actor, t.Any, dict]]:
+        return tuple(
+            (self.materialize(id), key, data)
+            for id, key, data in self._neighbors(actor)
+        )
+
+    def receivers_of(
+        self, actor: Actor, messages: tuple[type[Message], ...]
+    ) -> t.Sequence[Actor]:
+        ids = self._graph.memoize(
+            ("receivers", actor.id, messages),
+            lambda: tuple(
+                id
+                for id, _key, _data in self._neighbors(actor)
+                if all(self._descriptors[id].can_receive(m) for m in messages)
+            ),
+        )
+        return tuple(self.materialize(id) for id in ids)
+
+    def ranked_receivers_of(
+        self, actor: Actor, messages: tuple[type[Message], ...]
+    ) -> tuple[t.Sequence[Actor], Optional[t.Sequence[float]]]:
+        def rank():
+            weights: dict[str, float] = {}
+            for id, _key, data in self._neighbors(actor):
+                if all(self._descriptors[id].can_receive(m) for m in messages):
+                    weight = data.get("weight", 1)
+                    weights[id] = max(weights.get(id, weight), weight)
+            return ranked_by_weight(weights)
+
+        ids, cum_weights = self._graph.memoize(
+            ("ranked_receivers", actor.id, messages), rank
+        )
+        return tuple(self.materialize(id) for id in ids), cum_weights
+
+
+def _key(actor: str | Actor) -> str:
+    return actor if isinstance(actor, str) else actor.id
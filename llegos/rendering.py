@@ -0,0 +1,98 @@
+import typing as t
+from itertools import chain
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from beartype import beartype
+from beartype.typing import Callable, Optional
+
+from llegos.research import Message, message_ancestors
+
+
+def approximate_tokens(text: str) -> int:
+    "Roughly 4 characters per token, for when you don't need an exact tokenizer."
+    return len(text) // 4 + 1
+
+
+class Render(t.NamedTuple):
+    revision: int
+    text: str
+    tokens: int
+
+
+class MessageRenderer:
+    """
+    Renders messages to text for LLM context windows, memoizing each message's text
+    and token count until one of its fields is reassigned.
+
+    Renders are held weakly, so they live only as long as their messages. If you
+    mutate a nested object in place, call invalidate(message) yourself.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[Message], str] = str,
+        count_tokens: Callable[[str], int] = approximate_tokens,
+    ):
+        self.render_message = render
+        self.count_tokens = count_tokens
+        self.hits = 0
+        self.misses = 0
+        self._renders: WeakKeyDictionary[Message, Render] = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def _render(self, message: Message) -> Render:
+        with self._lock:
+            cached = self._renders.get(message)
+            if cached and cached.revision == message._revision:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        text = self.render_message(message)
+        render = Render(message._revision, text, self.count_tokens(text))
+        with self._lock:
+            self._renders[message] = render
+        return render
+
+    def render(self, message: Message) -> str:
+        return self._render(message).text
+
+    def tokens(self, message: Message) -> int:
+        return self._render(message).tokens
+
+    def invalidate(self, message: Message):
+        with self._lock:
+            self._renders.pop(message, None)
+
+    @beartype
+    def context(
+        self,
+        message: Message,
+        budget: int,
+        max_height: Optional[int] = None,
+    ) -> list[Message]:
+        """
+        The longest run of the message and its ancestors, oldest first, whose rendered
+        token counts fit within the budget.
+        """
+        context: list[Message] = []
+        for candidate in chain([message], message_ancestors(message)):
+            if max_height is not None and len(context) >= max_height:
+                break
+            budget -= self.tokens(candidate)
+            if budget < 0:
+                break
+            context.append(candidate)
+        return context[::-1]
+
+    def prompt(
+        self,
+        message: Message,
+        budget: int,
+        max_height: Optional[int] = None,
+        separator: str = "\n",
+    ) -> str:
+        return separator.join(
+            self.render(m) for m in self.context(message, budget, max_height)
+        )
@@ -0,0 +1,345 @@
+import typing as t
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from importlib import import_module
+from itertools import count
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+
+from beartype.typing import Callable, Iterator, Optional
+from pydantic import BaseModel, Field
+
+from llegos.research import (
+    Actor,
+    Chunk,
+    Message,
+    Object,
+    Scene,
+    Session,
+    message_digest,
+    session_context,
+)
+
+
+class ReplayDivergence(ValueError):
+    ...
+
+
+class RecordedReply(BaseModel):
+    id: str
+    cls: str = Field(description="The reply's class, as module:qualname")
+    sender_id: str
+    receiver_id: str
+    parent_id: Optional[str] = None
+    fields: dict = Field(default_factory=dict)
+
+
+class Step(BaseModel):
+    index: int
+    receiver_id: str
+    receiver_class: str
+    sender_id: str
+    message_id: str
+    message_class: str
+    digest: str
+    seconds: float
+    replies: list[RecordedReply] = Field(default_factory=list)
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return self.receiver_class, self.message_class, self.digest
+
+
+class Recording(BaseModel):
+    steps: list[Step] = Field(default_factory=list)
+
+    def save(self, path: str | Path):
+        Path(path).write_text(self.model_dump_json())
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Recording":
+        return cls.model_validate_json(Path(path).read_text())
+
+
+class StepTiming(BaseModel):
+    index: int
+    recorded_index: Optional[int] = None
+    receiver_id: str
+    message_class: str
+    seconds: float
+    recorded_seconds: float = 0.0
+
+
+class Divergence(BaseModel):
+    kind: t.Literal["unrecorded", "reordered", "unreplayed"]
+    index: int
+    detail: str
+
+
+class ReplayReport(BaseModel):
+    seconds: float = Field(description="Wall time of the replay")
+    recorded_seconds: float = Field(
+        description="Time the replayed handlers took when recorded"
+    )
+    stubbed_seconds: float = Field(
+        description="Time spent substituting recorded replies"
+    )
+    steps: list[StepTiming]
+    divergences: list[Divergence]
+
+    @property
+    def diverged(self) -> bool:
+        return bool(self.divergences)
+
+    @property
+    def overhead_seconds(self) -> float:
+        "Everything but the handlers that were replayed, that is the framework's time."
+        return self.seconds - self.stubbed_seconds
+
+
+def leaf(actor: Actor) -> bool:
+    "By default, the handlers of actors are replayed, while those of scenes run live."
+    return not isinstance(actor, Scene)
+
+
+def _class_path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _import(path: str) -> type[Message]:
+    module, qualname = path.split(":")
+    value = import_module(module)
+    for name in qualname.split("."):
+        value = getattr(value, name)
+    return value
+
+
+def _replies(response: t.Any) -> list[Message | Chunk]:
+    match response:
+        case Message() | Chunk():
+            return [response]
+        case t.Iterable():
+            return list(response)
+    return []
+
+
+class _Session(Session):
+    def __init__(self, stub: Callable[[Actor], bool]):
+        self.stub = stub
+        self.lock = Lock()
+
+    def intercepts(self, actor: Actor) -> bool:
+        return self.stub(actor)
+
+
+class _Recorder(_Session):
+    def __init__(self, stub: Callable[[Actor], bool]):
+        super().__init__(stub)
+        self.recording = Recording()
+
+    def handle(self, actor: Actor, handler: Callable, message: Message):
+        started = perf_counter()
+        replies = _replies(handler(message))
+        seconds = perf_counter() - started
+
+        with self.lock:
+            self.recording.steps.append(
+                Step(
+                    index=len(self.recording.steps),
+                    receiver_id=actor.id,
+                    receiver_class=_class_path(actor.__class__),
+                    sender_id=message.sender_id,
+                    message_id=message.id,
+                    message_class=_class_path(message.__class__),
+                    digest=message_digest(message),
+                    seconds=seconds,
+                    replies=[
+                        RecordedReply(
+                            id=reply.id,
+                            cls=_class_path(reply.__class__),
+                            sender_id=reply.sender_id,
+                            receiver_id=reply.receiver_id,
+                            parent_id=reply.parent_id,
+                            fields=reply.model_dump(
+                                exclude={
+                                    "id",
+                                    "created_at",
+                                    "sender",
+                                    "receiver",
+                                    "parent",
+                                }
+                            ),
+                        )
+                        for reply in replies
+                        if isinstance(reply, Message)
+                    ],
+                )
+            )
+        return replies
+
+
+class Replay(_Session):
+    """
+    Substitutes recorded replies for the handlers of stubbed actors. Steps are matched
+    by receiver class, message class and message content, so concurrent scenes can
+    replay in any order, and objects are matched to their recorded counterparts as
+    the replay goes. Chunks are not recorded, so replayed replies aren't streamed.
+
+    Every id and timestamp generated during the replay is deterministic.
+    """
+
+    epoch = datetime(2000, 1, 1)
+
+    def __init__(
+        self,
+        recording: Recording,
+        stub: Callable[[Actor], bool] = leaf,
+        on_missing: t.Literal["raise", "live"] = "raise",
+    ):
+        super().__init__(stub)
+        self.recording = recording
+        self.on_missing = on_missing
+        self.seconds = 0.0
+        self.timings: list[StepTiming] = []
+        self.divergences: list[Divergence] = []
+        self._pending: defaultdict[tuple, deque[Step]] = defaultdict(deque)
+        for step in recording.steps:
+            self._pending[step.key].append(step)
+        self._aliases: dict[str, Object] = {}
+        self._ids = count()
+        self._ticks = count()
+
+    def ksuid(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids):027d}"
+
+    def utcnow(self) -> datetime:
+        return self.epoch + timedelta(microseconds=next(self._ticks))
+
+    def handle(self, actor: Actor, handler: Callable, message: Message):
+        started = perf_counter()
+        key = (
+            _class_path(actor.__class__),
+            _class_path(message.__class__),
+            message_digest(message),
+        )
+        with self.lock:
+            index = len(self.timings)
+            step = self._pending[key].popleft() if self._pending[key] else None
+            if step is None:
+                self.divergences.append(
+                    Divergence(
+                        kind="unrecorded",
+                        index=index,
+                        detail=f"{actor.id} received an unrecorded {key[1]}",
+                    )
+                )
+                if self.on_missing == "raise":
+                    raise ReplayDivergence(message)
+            elif step.index != index:
+                self.divergences.append(
+                    Divergence(
+                        kind="reordered",
+                        index=index,
+                        detail=f"recorded as step {step.index}",
+                    )
+                )
+
+        if step is None:
+            replies = _replies(handler(message))
+        else:
+            replies = self._substitute(step, actor, message)
+
+        with self.lock:
+            self.timings.append(
+                StepTiming(
+                    index=index,
+                    recorded_index=step and step.index,
+                    receiver_id=actor.id,
+                    message_class=message.__class__.__name__,
+                    seconds=perf_counter() - started,
+                    recorded_seconds=step.seconds if step else 0.0,
+                )
+            )
+        return replies
+
+    def _substitute(self, step: Step, actor: Actor, message: Message) -> list[Message]:
+        aliases = self._aliases
+        aliases[step.message_id] = message
+        aliases[step.receiver_id] = actor
+        aliases[step.sender_id] = message.sender
+
+        replies = []
+        for recorded in step.replies:
+            parent = None
+            if recorded.parent_id is not None:
+                parent = aliases.get(recorded.parent_id, message)
+            reply = _import(recorded.cls)(
+                **recorded.fields,
+                sender=aliases.get(recorded.sender_id, actor),
+                receiver=aliases.get(recorded.receiver_id, message.sender),
+                parent=parent,
+            )
+            aliases[recorded.id] = reply
+            replies.append(reply)
+        return replies
+
+    def report(self) -> ReplayReport:
+        divergences = [
+            *self.divergences,
+            *(
+                Divergence(
+                    kind="unreplayed",
+                    index=step.index,
+                    detail=f"{step.receiver_id} never received the recorded {step.message_class}",
+                )
+                for steps in self._pending.values()
+                for step in steps
+            ),
+        ]
+        return ReplayReport(
+            seconds=self.seconds,
+            recorded_seconds=sum(timing.recorded_seconds for timing in self.timings),
+            stubbed_seconds=sum(
+                timing.seconds
+                for timing in self.timings
+                if timing.recorded_index is not None
+            ),
+            steps=self.timings,
+            divergences=sorted(divergences, key=lambda divergence: divergence.index),
+        )
+
+
+@contextmanager
+def recording(stub: Callable[[Actor], bool] = leaf) -> Iterator[Recording]:
+    "Record the replies of every stubbed actor's handlers."
+    session = _Recorder(stub)
+    token = session_context.set(session)
+    try:
+        yield session.recording
+    finally:
+        session_context.reset(token)
+
+
+@contextmanager
+def replaying(
+    recording: Recording,
+    stub: Callable[[Actor], bool] = leaf,
+    on_missing: t.Literal["raise", "live"] = "raise",
+) -> Iterator[Replay]:
+    """
+    Re-drive a scene with the recording's replies in place of the stubbed actors'
+    handlers, as fast as possible, and with deterministic ids and timestamps.
+
+    Objects created before the replay, like the scene itself, keep their ids, so create
+    them inside the replay for runs to be identical.
+    """
+    session = Replay(recording, stub, on_missing)
+    token = session_context.set(session)
+    started = perf_counter()
+    try:
+        yield session
+    finally:
+        session.seconds = perf_counter() - started
+        session_context.reset(token)
@@ -1,14 +1,22 @@
 import typing as t
+from abc import ABC, abstractmethod
 from collections.abc import Iterable
-from contextvars import ContextVar, Token
-from datetime import datetime
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import partial, wraps
+from hashlib import blake2b
+from heapq import heappop, heappush
+from itertools import accumulate, count
+from math import inf
+from random import choices
 
 from beartype import beartype
-from beartype.typing import Callable, Iterator, Optional
+from beartype.typing import Callable, Hashable, Iterator, Optional, TypeVar
 from deepmerge import always_merger
 from ksuid import Ksuid
 from networkx import DiGraph, MultiGraph
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic_core import SchemaSerializer
 from pydash import snake_case
 from pyee import EventEmitter
 from sorcery import delegate_to_attr, maybe
@@ -18,6 +26,8 @@ if t.TYPE_CHECKING:
 
 
 def namespaced_ksuid(prefix: str):
+    if session := session_context.get():
+        return session.ksuid(prefix)
     return f"{prefix}_{Ksuid()}"
 
 
@@ -25,6 +35,37 @@ def namespaced_ksuid_generator(prefix: str):
     return lambda: namespaced_ksuid(prefix)
 
 
+def utcnow() -> datetime:
+    if session := session_context.get():
+        return session.utcnow()
+    return datetime.utcnow()
+
+
+class Session(ABC):
+    """
+    While a session is active in a context, it generates the ids and timestamps of
+    objects created there, and handles the messages of the actors it intercepts, given
+    their handlers. See llegos.replay, which records and replays handlers' replies.
+    """
+
+    def ksuid(self, prefix: str) -> str:
+        return f"{prefix}_{Ksuid()}"
+
+    def utcnow(self) -> datetime:
+        return datetime.utcnow()
+
+    def intercepts(self, actor: "Actor") -> bool:
+        return True
+
+    @abstractmethod
+    def handle(self, actor: "Actor", handler: Callable, message: "Message") -> t.Any:
+        ...
+
+
+# Outside of a session, ids, timestamps and handlers only cost a lookup of this.
+session_context = ContextVar[Optional[Session]]("llegos.session", default=None)
+
+
 class Object(BaseModel):
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -39,6 +80,7 @@ class Object(BaseModel):
 
     id: str = Field(default_factory=namespaced_ksuid_generator("object"))
     metadata: dict = Field(default_factory=dict)
+    _revision: int = 0
 
     def model_dump_json(
         self,
@@ -77,6 +119,8 @@ class Object(BaseModel):
                 object.__setattr__(self, name, value)
             case _:
                 super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._revision += 1
 
     @classmethod
     def lift(cls, instance: "Object", **kwargs):
@@ -85,10 +129,164 @@ class Object(BaseModel):
         return cls(**attrs)
 
 
+C = TypeVar("C", bound=type)
+
+
+def serializable_as_extra(cls: C) -> C:
+    """
+    Replies and forwards of another message class carry fields over as extras, whose
+    type pydantic infers when serializing, so a custom type only serializes there if
+    it carries its own serializer, like models do. This gives it the one from its
+    __get_pydantic_core_schema__.
+    """
+    cls.__pydantic_serializer__ = SchemaSerializer(
+        cls.__get_pydantic_core_schema__(cls, None)
+    )
+    return cls
+
+
+T = TypeVar("T")
+
+
+class GraphBackend(t.Protocol):
+    """
+    What a Scene needs from its graph. SceneGraph, a networkx MultiGraph, is the
+    default, and llegos.graphs.CompactGraph trades flexibility for memory.
+
+    An edge's weight is the strength of the relationship, 1 if unset, so relationships
+    are listed strongest first, and receivers are ranked and sampled the same way.
+    Iterating a backend yields its nodes.
+    """
+
+    version: int
+
+    def invalidate(self) -> None:
+        ...
+
+    def memoize(self, key: Hashable, build: Callable[[], T], /) -> T:
+        ...
+
+    def add_node(self, node: t.Any, /) -> None:
+        ...
+
+    def add_edge(self, u: t.Any, v: t.Any, /, key: t.Any = None, **attr) -> t.Any:
+        ...
+
+    def remove_node(self, node: t.Any, /) -> None:
+        ...
+
+    def remove_edge(self, u: t.Any, v: t.Any, key: t.Any = None, /) -> None:
+        ...
+
+    def number_of_nodes(self) -> int:
+        ...
+
+    def number_of_edges(self) -> int:
+        ...
+
+    def relationships(self, node: t.Any, /) -> t.Sequence[tuple[t.Any, t.Any, dict]]:
+        ...
+
+    def __contains__(self, node: object, /) -> bool:
+        ...
+
+    def __iter__(self) -> t.Iterator:
+        ...
+
+
+class SceneGraph(MultiGraph):
+    """
+    A MultiGraph that memoizes indexes derived from it, like weight-sorted adjacency,
+    until its next structural change. If you mutate edge data in place, call
+    invalidate() yourself.
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.version = 0
+        self._memo: dict[Hashable, t.Any] = {}
+        super().__init__(incoming_graph_data, **attr)
+
+    def invalidate(self):
+        self.version += 1
+        self._memo = {}
+
+    def memoize(self, key: Hashable, build: Callable[[], T]) -> T:
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = build()
+            return value
+
+    def relationships(self, node: Hashable) -> t.Sequence[tuple[t.Any, t.Any, dict]]:
+        "The node's edges as (neighbor, key, data), by descending weight."
+        return self.memoize(
+            ("relationships", node),
+            lambda: tuple(
+                sorted(
+                    [
+                        (neighbor, key, data)
+                        for (_node, neighbor, key, data) in self.edges(
+                            node,
+                            keys=True,
+                            data=True,
+                        )
+                    ],
+                    key=lambda edge: edge[2].get("weight", 1),
+                    reverse=True,
+                )
+            ),
+        )
+
+
+def _invalidating(method):
+    @wraps(method)
+    def wrapper(self: SceneGraph, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.invalidate()
+
+    return wrapper
+
+
+for _method in (
+    "add_edge",
+    "add_edges_from",
+    "add_node",
+    "add_nodes_from",
+    "add_weighted_edges_from",
+    "clear",
+    "clear_edges",
+    "remove_edge",
+    "remove_edges_from",
+    "remove_node",
+    "remove_nodes_from",
+    "update",
+):
+    setattr(SceneGraph, _method, _invalidating(getattr(MultiGraph, _method)))
+
+
 class MissingScene(ValueError):
     ...
 
 
+class InvalidWeight(ValueError):
+    ...
+
+
+def ranked_by_weight(
+    weights: dict[T, float]
+) -> tuple[tuple[T, ...], Optional[tuple[float, ...]]]:
+    """
+    The keys by descending weight, with their cumulative weights for sampling, which
+    are None if any weight is negative.
+    """
+    ranked = tuple(sorted(weights, key=weights.__getitem__, reverse=True))
+    if ranked and weights[ranked[-1]] < 0:
+        return ranked, None
+    return ranked, tuple(accumulate(weights[key] for key in ranked))
+
+
 class InvalidMessage(ValueError):
     ...
 
@@ -112,9 +310,12 @@ class Actor(Object):
 
     def receive_method(self, message: "Message"):
         method = self.receive_method_name(message.__class__)
-        if hasattr(self, method):
-            return getattr(self, method)
-        return self.receive_missing
+        handler = (
+            getattr(self, method) if hasattr(self, method) else self.receive_missing
+        )
+        if (session := session_context.get()) and session.intercepts(self):
+            return partial(session.handle, self, handler)
+        return handler
 
     def receive_missing(self, message: "Message"):
         raise InvalidMessage(message)
@@ -123,6 +324,12 @@ class Actor(Object):
         return self.send(message)
 
     def send(self, message: "Message") -> Iterator["Message"]:
+        for reply in self.stream(message):
+            if not isinstance(reply, Chunk):
+                yield reply
+
+    def stream(self, message: "Message") -> Iterator[t.Union["Message", "Chunk"]]:
+        "Like send, but also yields the Chunks of replies as they are generated."
         self.emit("before:receive", message)
 
         response = self.receive_method(message)(message)
@@ -130,37 +337,52 @@ class Actor(Object):
         match response:
             case Message():
                 yield response
+            case Chunk():
+                self.emit("chunk", response)
+                yield response
             case Iterable():
-                yield from response
+                for reply in response:
+                    if isinstance(reply, Chunk):
+                        self.emit("chunk", reply)
+                    yield reply
 
         self.emit("after:receive", message)
 
     @property
     def scene(self):
-        if scene := scene_context.get():
-            return scene
+        if scenes := scene_context.get():
+            return scenes[-1]
         raise MissingScene(self)
 
     @property
-    def relationships(self) -> t.Sequence["Actor"]:
-        return sorted(
-            [
-                (neighbor, key, data)
-                for (_self, neighbor, key, data) in self.scene._graph.edges(
-                    self,
-                    keys=True,
-                    data=True,
-                )
-            ],
-            key=lambda edge: edge[2].get("weight", 1),
-        )
+    def relationships(self) -> t.Sequence[tuple["Actor", t.Any, dict]]:
+        "The actor's edges in its scene, strongest first, see GraphBackend."
+        return self.scene.relationships_of(self)
 
     def receivers(self, *messages: type["Message"]):
-        return [
-            actor
-            for actor, _key, _data in self.relationships
-            if all(actor.can_receive(m) for m in messages)
-        ]
+        "The neighbors that can receive every message class, strongest first."
+        return list(self.scene.receivers_of(self, messages))
+
+    def top_receivers(self, *messages: type["Message"], k: int = 1) -> list["Actor"]:
+        """
+        The k eligible receivers with the greatest edge weight, greatest first.
+        """
+        ranked, _cum_weights = self.scene.ranked_receivers_of(self, messages)
+        return list(ranked[:k])
+
+    def sample_receivers(self, *messages: type["Message"], k: int = 1) -> list["Actor"]:
+        """
+        Sample k eligible receivers (with replacement) in proportion to their edge weight,
+        or uniformly if every weight is 0. Negative weights can't be sampled from.
+        """
+        ranked, cum_weights = self.scene.ranked_receivers_of(self, messages)
+        if not ranked:
+            return []
+        if cum_weights is None:
+            raise InvalidWeight("sample_receivers needs non-negative weights", self)
+        if not cum_weights[-1]:
+            return choices(ranked, k=k)
+        return choices(ranked, cum_weights=cum_weights, k=k)
 
     (
         add_listener,
@@ -176,7 +398,7 @@ class Actor(Object):
 
 class Scene(Actor):
     actors: t.Sequence[Actor] = Field(default_factory=list)
-    _graph = MultiGraph()
+    _graph: GraphBackend = SceneGraph()
 
     def __init__(self, actors: t.Sequence[Actor], **kwargs):
         super().__init__(actors=actors, **kwargs)
@@ -203,23 +425,70 @@ class Scene(Actor):
     def directory(self):
         return {a.id: a for a in self.actors}
 
+    def relationships_of(self, actor: Actor) -> t.Sequence[tuple[Actor, t.Any, dict]]:
+        return self._graph.relationships(actor)
+
+    def receivers_of(
+        self, actor: Actor, messages: tuple[type["Message"], ...]
+    ) -> t.Sequence[Actor]:
+        return self._graph.memoize(
+            ("receivers", actor, messages),
+            lambda: tuple(
+                neighbor
+                for neighbor, _key, _data in self.relationships_of(actor)
+                if all(neighbor.can_receive(m) for m in messages)
+            ),
+        )
+
+    def ranked_receivers_of(
+        self, actor: Actor, messages: tuple[type["Message"], ...]
+    ) -> tuple[t.Sequence[Actor], Optional[t.Sequence[float]]]:
+        """
+        Eligible receivers by descending edge weight, with their cumulative weights.
+        """
+
+        def rank():
+            weights: dict[Actor, float] = {}
+            for neighbor, _key, data in self.relationships_of(actor):
+                if all(neighbor.can_receive(m) for m in messages):
+                    weight = data.get("weight", 1)
+                    weights[neighbor] = max(weights.get(neighbor, weight), weight)
+            return ranked_by_weight(weights)
+
+        return self._graph.memoize(("ranked_receivers", actor, messages), rank)
+
     def __enter__(self):
-        global scene_token, scene_context
-        scene_token = scene_context.set(self)
+        scene_context.set((*scene_context.get(), self))
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        global scene_token, scene_context
-        if scene_token:
-            scene_context.reset(scene_token)
-            scene_token = None
+        scenes = scene_context.get()
+        for index in reversed(range(len(scenes))):
+            if scenes[index] is self:
+                scene_context.set(scenes[:index] + scenes[index + 1 :])
+                return
+        raise MissingScene(self)
 
 
-scene_context = ContextVar[Scene]("llegos.scene")
-scene_token: Optional[Token[Scene]] = None
+# The stack of entered scenes, innermost last. Threads and asyncio tasks each see
+# their own copy, so scenes can be nested, re-entered, and entered concurrently.
+scene_context = ContextVar[tuple[Scene, ...]]("llegos.scene", default=())
 
 
 class Message(Object):
+    @classmethod
+    def lift(cls, instance: Object, **kwargs):
+        """
+        A lifted message is a new message, so it gets its own id and timestamp.
+
+        Objects passed in kwargs replace the instance's outright, so they are not dumped,
+        which saves re-serializing the whole conversation on every reply and forward.
+        """
+        replaced = {key for key, value in kwargs.items() if isinstance(value, Object)}
+        attrs = instance.model_dump(exclude={"id", "created_at", *replaced})
+        always_merger.merge(attrs, kwargs)
+        return cls(**attrs)
+
     @classmethod
     def reply_to(cls, message: "Message", **kwargs):
         kwargs.update(
@@ -242,11 +511,27 @@ class Message(Object):
         )
         return cls.lift(message, **kwargs)
 
-    created_at: datetime = Field(default_factory=datetime.utcnow, frozen=True)
+    created_at: datetime = Field(default_factory=utcnow, frozen=True)
+    priority: Optional[int] = Field(
+        default=None,
+        description="Higher priority messages are scheduled first, default 0",
+    )
+    deadline: Optional[datetime] = Field(
+        default=None,
+        description="Messages are dropped once expired, inherited by replies and forwards",
+    )
     sender: t.ForwardRef("Actor")
     receiver: t.ForwardRef("Actor")
     parent: Optional[t.ForwardRef("Message")] = None
 
+    @field_validator("deadline")
+    @classmethod
+    def naive_utc_deadline(cls, deadline: Optional[datetime]) -> Optional[datetime]:
+        "Timestamps are naive UTC, so aware deadlines are converted to match."
+        if deadline is not None and deadline.tzinfo is not None:
+            return deadline.astimezone(timezone.utc).replace(tzinfo=None)
+        return deadline
+
     @property
     def sender_id(self) -> str:
         return self.sender.id
@@ -259,6 +544,10 @@ class Message(Object):
     def parent_id(self) -> Optional[str]:
         return maybe(self.parent).id
 
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and self.deadline <= datetime.utcnow()
+
     def __str__(self):
         return self.model_dump_json(exclude={"parent"})
 
@@ -269,6 +558,54 @@ class Message(Object):
         return self.reply_to(self, **kwargs)
 
 
+class Chunk(t.NamedTuple):
+    "An increment of a reply that is still being generated, see Stream."
+
+    id: str  # the id of the assembled reply
+    index: int
+    delta: t.Any
+    sender: Actor
+    receiver: Actor
+
+
+class Stream:
+    """
+    Lets a handler reply incrementally, to cut the time to first token: yield chunk()
+    for each delta as it is generated, then yield finish() to assemble the reply.
+    Chunks are plain tuples, so only the assembled reply is validated.
+
+    String deltas are joined into the field, any others are collected into a list.
+    """
+
+    def __init__(
+        self, message_class: type[Message], parent: Message, field: str = "content"
+    ):
+        self.message_class = message_class
+        self.parent = parent
+        self.field = field
+        self.id: str = message_class.model_fields["id"].default_factory()
+        self.deltas: list[t.Any] = []
+
+    def chunk(self, delta: t.Any) -> Chunk:
+        self.deltas.append(delta)
+        return Chunk(
+            id=self.id,
+            index=len(self.deltas) - 1,
+            delta=delta,
+            sender=self.parent.receiver,
+            receiver=self.parent.sender,
+        )
+
+    def finish(self, **kwargs) -> Message:
+        if all(isinstance(delta, str) for delta in self.deltas):
+            value = "".join(self.deltas)
+        else:
+            value = list(self.deltas)
+        return self.message_class.reply_to(
+            self.parent, **{"id": self.id, self.field: value, **kwargs}
+        )
+
+
 @beartype
 def message_chain(message: Message | None, height: int) -> Iterator[Message]:
     if message is None:
@@ -283,6 +620,28 @@ def message_list(message: Message, height: int) -> list[Message]:
     return list(message_chain(message, height))
 
 
+@beartype
+def message_digest(message: Message) -> str:
+    """
+    A hash of the message's class and content, ignoring its identity and its place in
+    the conversation, so content-identical messages share a digest.
+    """
+    content = message.model_dump_json(
+        exclude={
+            "id",
+            "created_at",
+            "priority",
+            "deadline",
+            "sender",
+            "receiver",
+            "parent",
+        }
+    )
+    return blake2b(
+        f"{message.__class__.__qualname__}:{content}".encode(), digest_size=16
+    ).hexdigest()
+
+
 @beartype
 def message_tree(messages: Iterable[Message]):
     g = DiGraph()
@@ -319,10 +678,21 @@ class MissingReceiver(ValueError):
 
 
 @beartype
-def message_send(message: Message) -> Iterator[Message]:
+def message_stream(message: Message) -> Iterator[Message | Chunk]:
+    "Like message_send, but also yields the Chunks of replies as they are generated."
     if not message.receiver:
         raise MissingReceiver(message)
-    yield from message.receiver.send(message)
+    if message.expired:
+        message.receiver.emit("expired", message)
+        return
+    yield from message.receiver.stream(message)
+
+
+@beartype
+def message_send(message: Message) -> Iterator[Message]:
+    for reply in message_stream(message):
+        if not isinstance(reply, Chunk):
+            yield reply
 
 
 @beartype
@@ -336,6 +706,45 @@ def message_propogate(
             yield from message_propogate(reply, applicator)
 
 
+@beartype
+def message_schedule(
+    *messages: Message,
+    applicator: Callable[[Message], Iterator[Message]] = message_send,
+    on_expired: Optional[Callable[[Message], Iterable[Message]]] = None,
+) -> Iterator[Message]:
+    """
+    Like message_propogate, but replies are queued instead of followed depth-first.
+
+    Messages are delivered by highest priority, then earliest deadline, then arrival.
+    Expired messages are dropped, or short-circuited through on_expired, whose
+    messages are yielded and scheduled in their place. Those would inherit the
+    deadline that just passed, so an expired one is scheduled without it.
+    """
+    queue: list[tuple[int, float, int, Message]] = []
+    arrival = count()
+
+    def schedule(message: Message):
+        deadline = message.deadline.timestamp() if message.deadline else inf
+        heappush(queue, (-(message.priority or 0), deadline, next(arrival), message))
+
+    for message in messages:
+        schedule(message)
+
+    while queue:
+        *_, message = heappop(queue)
+        if message.expired:
+            for reply in on_expired(message) if on_expired else []:
+                if reply.expired:
+                    reply = reply.model_copy(update={"deadline": None})
+                yield reply
+                schedule(reply)
+            continue
+        for reply in applicator(message):
+            if reply:
+                yield reply
+                schedule(reply)
+
+
 Object.model_rebuild()
 Message.model_rebuild()
 Actor.model_rebuild()
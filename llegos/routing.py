@@ -0,0 +1,86 @@
+import typing as t
+
+from beartype import beartype
+from beartype.typing import Callable, Iterator
+
+from llegos.research import Actor, Message, Scene, message_send
+
+
+class Route(t.NamedTuple):
+    scenes: tuple[Scene, ...]
+    actor: Actor
+
+    @property
+    def scene(self) -> Scene:
+        return self.scenes[-1]
+
+
+class SceneRouter:
+    """
+    Compiles a hierarchy of nested Scenes into flat routes from the root scene to the
+    actors that can receive a message class, so a message can be fanned out to them
+    directly instead of hopping through every level of nesting.
+
+    Routes are cached per message class, and recompiled when the graph of any scene
+    they pass through has changed since.
+    """
+
+    def __init__(
+        self, root: Scene, descend: Callable[[Scene], bool] = lambda scene: True
+    ):
+        self.root = root
+        self.descend = descend
+        self._routes: dict[
+            type[Message], tuple[tuple[tuple[Scene, int], ...], tuple[Route, ...]]
+        ] = {}
+
+    @beartype
+    def routes(self, message_class: type[Message]) -> tuple[Route, ...]:
+        if cached := self._routes.get(message_class):
+            versions, routes = cached
+            if all(scene._graph.version == version for scene, version in versions):
+                return routes
+
+        visited: dict[Scene, int] = {}
+        routes = tuple(self._compile(message_class, (self.root,), visited, set()))
+        self._routes[message_class] = (tuple(visited.items()), routes)
+        return routes
+
+    def _compile(
+        self,
+        message_class: type[Message],
+        path: tuple[Scene, ...],
+        visited: dict[Scene, int],
+        seen: set[str],
+    ) -> Iterator[Route]:
+        scene = path[-1]
+        visited[scene] = scene._graph.version
+        if scene not in scene._graph:
+            return
+
+        with scene:
+            members = [actor for actor, _key, _data in scene.relationships]
+
+        for actor in members:
+            if actor.id in seen or any(actor is s for s in path):
+                continue
+            if isinstance(actor, Scene) and self.descend(actor):
+                yield from self._compile(message_class, (*path, actor), visited, seen)
+            elif actor.can_receive(message_class):
+                seen.add(actor.id)
+                yield Route(path, actor)
+
+    def receivers(self, message_class: type[Message]) -> list[Actor]:
+        return [route.actor for route in self.routes(message_class)]
+
+    def invalidate(self):
+        self._routes.clear()
+
+    @beartype
+    def send(self, message: Message) -> Iterator[Message]:
+        """
+        Forward the message to every compiled receiver, each within its own scene.
+        """
+        for route in self.routes(message.__class__):
+            with route.scene:
+                yield from message_send(message.forward_to(route.actor))
@@ -0,0 +1,208 @@
+import typing as t
+from collections.abc import Sequence
+from threading import Lock
+from weakref import WeakValueDictionary
+
+from beartype.typing import Iterator, Optional
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema, to_json
+
+from llegos.research import Actor, Message, namespaced_ksuid, serializable_as_extra
+
+
+class UnknownTranscript(ValueError):
+    ...
+
+
+transcripts: WeakValueDictionary[str, "Transcript"] = WeakValueDictionary()
+
+
+@serializable_as_extra
+class TranscriptView(Sequence):
+    """
+    An immutable window onto a transcript, like a snapshot of it after some round. It
+    only holds its bounds, so it is as cheap to put in every message as an int, and it
+    serializes to a reference rather than to the messages it covers.
+    """
+
+    __slots__ = ("transcript", "start", "stop")
+
+    def __init__(self, transcript: "Transcript", start: int, stop: int):
+        self.transcript = transcript
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @t.overload
+    def __getitem__(self, index: int) -> Message:
+        ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> list[Message]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.transcript._entries[self.start + index]
+
+    def __iter__(self) -> Iterator[Message]:
+        entries = self.transcript._entries
+        for i in range(self.start, self.stop):
+            yield entries[i]
+
+    def __eq__(self, other: t.Any) -> bool:
+        if isinstance(other, TranscriptView):
+            return (self.transcript, self.start, self.stop) == (
+                other.transcript,
+                other.start,
+                other.stop,
+            )
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.transcript.id, self.start, self.stop))
+
+    def __repr__(self):
+        return f"TranscriptView({self.transcript.id!r}, {self.start}, {self.stop})"
+
+    def by(self, sender: Actor) -> list[Message]:
+        return [message for message in self if message.sender == sender]
+
+    def reference(self) -> dict[str, t.Any]:
+        return {
+            "transcript": self.transcript.id,
+            "start": self.start,
+            "stop": self.stop,
+        }
+
+    @classmethod
+    def _validate(cls, value: t.Any) -> "TranscriptView":
+        match value:
+            case TranscriptView():
+                return value
+            case Transcript():
+                return value.view()
+            case {"transcript": str(id), "start": int(start), "stop": int(stop)}:
+                if transcript := transcripts.get(id):
+                    return cls(transcript, start, stop)
+                raise UnknownTranscript(id)
+        raise ValueError(f"Expected a TranscriptView, not {value!r}")
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: t.Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda view: view.reference(), when_used="json"
+            ),
+        )
+
+
+@serializable_as_extra
+class Transcript:
+    """
+    The shared, append-only record of a round-based scene, like a debate. Instead of
+    copying everything said so far into every message, the scene appends to one
+    transcript, and passes participants a TranscriptView of it.
+
+    Each round can be serialized on its own, as the delta since the previous one.
+    """
+
+    def __init__(self, id: Optional[str] = None):
+        self.id = id or namespaced_ksuid("transcript")
+        self._entries: list[Message] = []
+        self._rounds: list[int] = [0]
+        self._lock = Lock()
+        transcripts[self.id] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.view())
+
+    def __repr__(self):
+        return f"Transcript({self.id!r}, entries={len(self)}, rounds={self.rounds})"
+
+    @property
+    def rounds(self) -> int:
+        "The number of completed rounds."
+        return len(self._rounds) - 1
+
+    def append(self, message: Message) -> int:
+        with self._lock:
+            self._entries.append(message)
+            return len(self._entries) - 1
+
+    def extend(self, messages: t.Iterable[Message]):
+        with self._lock:
+            self._entries.extend(messages)
+
+    def end_round(self) -> TranscriptView:
+        "Close the current round, and return a view of everything up to its end."
+        with self._lock:
+            self._rounds.append(len(self._entries))
+            return TranscriptView(self, 0, self._rounds[-1])
+
+    def view(self) -> TranscriptView:
+        return TranscriptView(self, 0, len(self._entries))
+
+    def round(self, index: int) -> TranscriptView:
+        """
+        A view of what was said in one round. The round in progress comes last, so
+        round(-1) is what was said since the last end_round().
+        """
+        bounds = [*self._rounds, len(self._entries)]
+        if index < 0:
+            index += len(bounds) - 1
+        if not 0 <= index < len(bounds) - 1:
+            raise IndexError(index)
+        return TranscriptView(self, bounds[index], bounds[index + 1])
+
+    def delta_json(self, index: int) -> str:
+        """
+        The messages of one round as JSON, without their parents, so each round is only
+        serialized once however long the transcript grows.
+        """
+        view = self.round(index)
+        return to_json(
+            {
+                "transcript": self.id,
+                "round": index,
+                "start": view.start,
+                "entries": [
+                    message.model_dump(exclude={"parent"}, exclude_none=True)
+                    for message in view
+                ],
+            }
+        ).decode()
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: t.Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        def validate(value: t.Any) -> "Transcript":
+            match value:
+                case Transcript():
+                    return value
+                case {"transcript": str(id)}:
+                    if transcript := transcripts.get(id):
+                        return transcript
+                    raise UnknownTranscript(id)
+            raise ValueError(f"Expected a Transcript, not {value!r}")
+
+        return core_schema.no_info_plain_validator_function(
+            validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda transcript: {"transcript": transcript.id}, when_used="json"
+            ),
+        )
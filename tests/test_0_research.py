@@ -34,6 +34,7 @@ def test_message_reply_to() -> None:
     m1 = Message(sender=a1, receiver=a2)
     m2 = Message.reply_to(m1)
     assert m2.parent == m1
+    assert m2.id != m1.id
     assert Message.model_validate(m2.model_dump()).parent_id == m1.id
 
 
@@ -0,0 +1,205 @@
+"""
+ExecutiveBehavior plans ahead with a beam search over its ActionBehavior, WorldModelBehavior
+and CostBehavior. Here, an agent walks a number line where the greedy first step is a trap.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter, sleep
+
+from llegos.abc.cognitive.planning import TranspositionTable
+from llegos.abc.cognitive.reinforcement import (
+    Action,
+    ActionBehavior,
+    Cost,
+    CostBehavior,
+    ExecutiveBehavior,
+    Percept,
+    Reward,
+    RewardBehavior,
+    WorldModelBehavior,
+)
+
+COSTS = {-1: 9, 0: 0, 1: 2, 2: 8, 3: 1, 4: 8, 6: 8}
+
+
+class Position(Percept):
+    x: int
+
+
+class Move(Action):
+    dx: int
+
+
+class Walker(CostBehavior, RewardBehavior, ActionBehavior, WorldModelBehavior):
+    def forward(self, message):
+        match message:
+            case Position():
+                return Cost(
+                    sender=self,
+                    receiver=self,
+                    parent=message,
+                    value=COSTS.get(message.x, 9),
+                )
+            case Cost():
+                return Reward(
+                    sender=self, receiver=self, parent=message, value=-message.value
+                )
+            case Reward():
+                position: Position = message.parent.parent
+                return [
+                    Move(sender=self, receiver=self, parent=position, dx=dx)
+                    for dx in (-1, 1, 3)
+                ]
+            case Move():
+                return Position(
+                    sender=self,
+                    receiver=self,
+                    parent=message,
+                    x=message.parent.x + message.dx,
+                )
+
+    def backward(self, message):
+        ...
+
+
+class Executive(ExecutiveBehavior):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        walker = Walker()
+        self._cost = self._reward = self._action = self._world_model = walker
+
+
+def test_greedy_falls_for_the_trap():
+    executive = Executive()
+    start = Position(sender=executive, receiver=executive, x=0)
+
+    plan = executive.plan(start, action_lookahead=2)
+    assert [move.dx for move in plan.actions] == [3, -1]
+    assert plan.cost == 9
+
+
+def test_beam_search_looks_past_the_trap():
+    executive = Executive(beam_width=2)
+    start = Position(sender=executive, receiver=executive, x=0)
+
+    plan = executive.plan(start, action_lookahead=2)
+    assert [move.dx for move in plan.actions] == [1, -1]
+    assert [step.x for step in plan.steps] == [1, 0]
+    assert plan.cost == 2
+    assert executive.forward(start, action_lookahead=2).dx == 1
+
+    """
+    Every depth reports how many candidates it expanded, and where the time went.
+    """
+    assert [(s.depth, s.beam, s.rollouts) for s in plan.stats] == [(1, 1, 3), (2, 2, 6)]
+    assert all(s.rollout_seconds >= 0 for s in plan.stats)
+
+
+def test_parallel_rollouts():
+    executive = Executive(beam_width=2)
+    start = Position(sender=executive, receiver=executive, x=0)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        executive._executor = executor
+        plan = executive.plan(start, action_lookahead=3)
+
+    serial = Executive(beam_width=2).plan(start, action_lookahead=3)
+    assert [m.dx for m in plan.actions] == [m.dx for m in serial.actions]
+    assert plan.cost == serial.cost
+
+    """
+    Rollouts share the behaviors and transposition table, so only threads will do.
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        executive._executor = executor
+        try:
+            executive.plan(start, action_lookahead=1)
+            assert False, "process pools are rejected"
+        except TypeError:
+            pass
+
+
+def test_transposition_table():
+    """
+    World-model rollouts are memoized on the content of the step and action, so
+    re-planning from the same position doesn't re-predict what it already knows.
+    """
+    executive = Executive(beam_width=2)
+    start = Position(sender=executive, receiver=executive, x=0)
+
+    first = executive.plan(start, action_lookahead=2)
+    assert executive._transpositions.hits == 0
+
+    restart = Position(sender=executive, receiver=executive, x=0)
+    again = executive.plan(restart, 2)
+    assert [s.hits for s in again.stats] == [s.rollouts for s in again.stats]
+    assert again.cost == first.cost
+    assert executive._transpositions.hit_rate == 0.5
+
+    """
+    Only the content of a rollout is memoized, so predicted steps served from the table
+    descend from the actions of the plan they are in, as CostBehavior.backward expects.
+    """
+    assert all(
+        step.parent is action for step, action in zip(again.steps, again.actions)
+    )
+    assert again.steps[0].parent.parent is restart
+    assert [step.x for step in again.steps] == [step.x for step in first.steps]
+
+    """
+    Learning invalidates the table.
+    """
+    executive.backward(start)
+    assert len(executive._transpositions) == 0
+
+
+def test_transposition_table_eviction():
+    table = TranspositionTable(maxsize=2)
+    for key in ["a", "b", "a", "c"]:
+        table.lookup(key, lambda: key.upper())
+
+    assert table.hits == 1
+    assert table.evictions == 1
+    assert table.lookup("a", lambda: "recomputed") == "A", "a was recently used"
+    assert table.lookup("b", lambda: "recomputed") == "recomputed", "b was evicted"
+
+
+class SlowLearner(Walker):
+    batches: list[int] = []
+
+    def backward_batch(self, realized_steps):
+        sleep(0.2)
+        self.batches.append(len(realized_steps))
+
+
+def test_concurrent_backward_batch():
+    """
+    The action and world models learn from the same rewards, independently of each
+    other, so given an executor they are updated concurrently, in one batch each.
+    """
+    executive = Executive()
+    action, world_model = SlowLearner(), SlowLearner()
+    executive._action, executive._world_model = action, world_model
+
+    moves = [Move(sender=executive, receiver=executive, dx=dx) for dx in (-1, 1, 3)]
+    steps = [
+        Position(sender=executive, receiver=executive, parent=move, x=move.dx)
+        for move in moves
+    ]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executive._executor = executor
+        started = perf_counter()
+        executive.backward_batch(steps)
+        elapsed = perf_counter() - started
+
+    assert action.batches == world_model.batches == [3]
+    assert elapsed < 0.35
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        executive._executor = executor
+        try:
+            executive.backward_batch(steps)
+            assert False, "process pools are rejected"
+        except TypeError:
+            pass
@@ -0,0 +1,79 @@
+"""
+CostBehavior and RewardBehavior record their experience in an ExperienceStore: a bounded
+ring buffer of message transitions, with NumPy arrays of weights and errors that can be
+updated and sampled in batches during backward().
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from llegos import research as llegos
+from llegos.abc.cognitive.experience import ExperienceStore
+
+
+def chain(length: int) -> list[llegos.Message]:
+    actor = llegos.Actor()
+    messages = [llegos.Message(sender=actor, receiver=actor)]
+    for _ in range(length - 1):
+        messages.append(messages[-1].reply())
+    return messages
+
+
+def test_add_and_get():
+    a, b, c = chain(3)
+    store = ExperienceStore()
+
+    slot = store.add(a, b, weight=1.0)
+    assert store.get(a, b) == slot
+    assert store.get(b, c) is None
+    assert (a, b) in store
+
+    assert store.add(a, b, weight=2.0, error=0.5) == slot, "re-adding overwrites"
+    assert store.weights.tolist() == [2.0]
+    assert store.errors.tolist() == [0.5]
+
+
+def test_ring_buffer_eviction():
+    messages = chain(6)
+    store = ExperienceStore(capacity=3)
+    for source, target in zip(messages, messages[1:]):
+        store.add(source, target)
+
+    assert len(store) == 3
+    assert store.evictions == 2
+    assert (messages[0], messages[1]) not in store
+    assert (messages[4], messages[5]) in store
+    assert messages[0].id not in store._node_ids, "unreferenced messages are released"
+
+
+def test_batch_update_and_sample():
+    messages = chain(5)
+    store = ExperienceStore()
+    slots = np.array([store.add(s, t) for s, t in zip(messages, messages[1:])])
+
+    store.update(slots, weights=np.arange(4.0), errors=np.array([0.0, 0.0, 0.0, 1.0]))
+    assert store.weights.tolist() == [0.0, 1.0, 2.0, 3.0]
+
+    assert sorted(store.sample(10).tolist()) == [0, 1, 2, 3]
+    assert store.sample(2, prioritized=True).tolist() == [3], "only errors are replayed"
+
+    g = store.to_networkx()
+    assert g.number_of_edges() == 4
+    assert g[messages[3]][messages[4]] == {"weight": 3.0, "error": 1.0}
+
+
+def test_concurrent_adds():
+    """
+    Planning rollouts record costs from a thread pool, so adds can race with eviction.
+    """
+    messages = chain(2_001)
+    store = ExperienceStore(capacity=100)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: store.add(messages[i], messages[i + 1]), range(2_000)))
+
+    assert len(store) == 100
+    assert store.evictions == 1_900
+    assert len(store._slots) == 100
+    assert sorted(store._slots.values()) == list(range(100))
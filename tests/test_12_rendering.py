@@ -0,0 +1,59 @@
+"""
+Building prompts re-renders the same ancestors every turn. A MessageRenderer memoizes
+each message's rendering and token count, and builds token-budgeted contexts from them.
+"""
+
+from llegos import research as llegos
+from llegos.rendering import MessageRenderer
+
+
+class ChatMessage(llegos.Message):
+    content: str
+
+
+def conversation(turns: int) -> ChatMessage:
+    a1, a2 = llegos.Actor(), llegos.Actor()
+    message = ChatMessage(sender=a1, receiver=a2, content="turn 0")
+    for turn in range(1, turns):
+        message = message.reply(content=f"turn {turn}")
+    return message
+
+
+def test_renders_are_memoized():
+    renderer = MessageRenderer()
+    message = conversation(1)
+
+    assert renderer.render(message) == str(message)
+    assert renderer.render(message) == str(message)
+    assert (renderer.hits, renderer.misses) == (1, 1)
+
+    """
+    Reassigning a field invalidates the cached render.
+    """
+    message.content = "edited"
+    assert "edited" in renderer.render(message)
+    assert renderer.misses == 2
+
+
+def test_token_budgeted_context():
+    renderer = MessageRenderer(count_tokens=lambda text: 10)
+    latest = conversation(10)
+
+    context = renderer.context(latest, budget=35)
+    assert [m.content for m in context] == ["turn 7", "turn 8", "turn 9"]
+    assert context == llegos.message_list(latest, 3)
+
+    assert [m.content for m in renderer.context(latest, budget=1000, max_height=2)] == [
+        "turn 8",
+        "turn 9",
+    ]
+
+    prompt = renderer.prompt(latest, budget=25)
+    assert prompt == "\n".join(str(m) for m in llegos.message_list(latest, 2))
+
+    """
+    Turn after turn, only the new message needs rendering.
+    """
+    misses = renderer.misses
+    renderer.context(latest.reply(content="turn 10"), budget=35)
+    assert renderer.misses == misses + 1
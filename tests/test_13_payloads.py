@@ -0,0 +1,81 @@
+"""
+Large message fields, like retrieved documents or embeddings, can be wrapped in a Payload:
+an immutable buffer that replies and forwards share by reference instead of copying.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from llegos import research as llegos
+from llegos.payload import Payload
+
+
+class MapResponse(llegos.Message):
+    sources: Payload
+
+
+class Embedding(llegos.Message):
+    vector: Payload
+
+
+def test_payloads_are_shared_by_reference():
+    a1, a2, a3 = llegos.Actor(), llegos.Actor(), llegos.Actor()
+    sources = Payload.from_json(["The Hitchhiker's Guide to the Galaxy", "Star Wars"])
+
+    response = MapResponse(sender=a1, receiver=a2, sources=sources)
+    forwarded = response.forward_to(a3)
+    reply = forwarded.reply()
+
+    assert forwarded.sources is sources
+    assert reply.sources is sources
+    assert reply.sources.json() == ["The Hitchhiker's Guide to the Galaxy", "Star Wars"]
+
+
+def test_payloads_serialize_by_content_hash():
+    a1, a2 = llegos.Actor(), llegos.Actor()
+    vector = Payload(np.arange(1024, dtype=np.float32))
+    message = Embedding(sender=a1, receiver=a2, vector=vector)
+
+    logged = json.loads(str(message))
+    assert logged["vector"] == {"digest": vector.digest, "size": 4096}
+
+    """
+    Within a process, references resolve back to the same payload.
+    """
+    assert Embedding.model_validate_json(message.model_dump_json()).vector is vector
+    assert Payload(np.arange(1024, dtype=np.float32)) == vector
+
+    """
+    Replies of another class carry the payload as an extra field, which serializes the
+    same way.
+    """
+    reply = MapResponse.reply_to(message, sources=Payload(b""))
+    assert reply.vector is vector
+    assert json.loads(str(reply))["vector"] == {"digest": vector.digest, "size": 4096}
+    assert json.loads(reply.model_dump_json())["vector"]["digest"] == vector.digest
+
+
+def test_memory_mapped_payloads(tmp_path):
+    path = tmp_path / "corpus.txt"
+    path.write_bytes(b"Doctor Who\nStar Trek\n")
+
+    payload = Payload.from_file(path)
+    assert bytes(payload).splitlines() == [b"Doctor Who", b"Star Trek"]
+
+
+def total(embedding: Embedding) -> float:
+    return float(embedding.vector.array().sum())
+
+
+def test_shared_memory_payloads():
+    a1, a2 = llegos.Actor(), llegos.Actor()
+    vector = Payload(np.ones((256, 256))).share()
+    try:
+        assert vector.array().shape == (256, 256)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            embedding = Embedding(sender=a1, receiver=a2, vector=vector)
+            assert pool.submit(total, embedding).result() == 256 * 256
+    finally:
+        vector.unlink()
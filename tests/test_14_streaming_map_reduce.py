@@ -0,0 +1,109 @@
+"""
+llegos.map_reduce.MapReduce is a reusable version of the MapReducer in test_4_map_reduce.
+Mappers run concurrently, and their replies are combined as soon as they arrive, so
+reduction doesn't wait for the slowest mapper.
+"""
+
+from time import perf_counter, sleep
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.map_reduce import Combine, MapReduce
+
+
+class MapRequest(llegos.Message):
+    query: str
+
+
+class MapResponse(llegos.Message):
+    sources: list[str]
+
+
+class Mapper(llegos.Actor):
+    sources: list[str]
+    latency: float = Field(default=0.0)
+
+    def receive_map_request(self, request: MapRequest):
+        sleep(self.latency)
+        return MapResponse.reply_to(request, sources=self.sources)
+
+
+class SourcesMapReduce(MapReduce):
+    enough: int = Field(default=0, description="Stop once this many sources are found")
+
+    def __init__(self, mappers: list[Mapper], **kwargs):
+        super().__init__(actors=mappers, **kwargs)
+
+    def receive_map_request(self, request: MapRequest):
+        result = self.map_reduce(request)
+        return MapResponse.reply_to(request, sources=result.sources if result else [])
+
+    def receive_combine(self, message: Combine) -> MapResponse:
+        left, right = message.left, message.right
+        return MapResponse.reply_to(
+            left.parent, sources=sorted({*left.sources, *right.sources})
+        )
+
+    def good_enough(self, partial: MapResponse) -> bool:
+        return bool(self.enough) and len(partial.sources) >= self.enough
+
+
+def request(receiver: llegos.Actor) -> MapRequest:
+    return MapRequest(sender=llegos.Actor(), receiver=receiver, query="Query?")
+
+
+def test_incremental_reduction():
+    map_reduce = SourcesMapReduce(
+        [
+            Mapper(sources=["The Hitchhiker's Guide to the Galaxy", "Star Wars"]),
+            Mapper(sources=["Doctor Who", "Star Wars"]),
+            Mapper(sources=["Star Trek"]),
+        ]
+    )
+
+    message = request(map_reduce)
+    (response,) = llegos.message_send(message)
+    assert response.receiver == message.sender
+    assert response.sources == sorted(
+        ["The Hitchhiker's Guide to the Galaxy", "Star Wars", "Doctor Who", "Star Trek"]
+    )
+
+
+def test_tree_reduction_over_a_large_fan_out():
+    map_reduce = SourcesMapReduce(
+        [Mapper(sources=[f"source {i}"], latency=0.001 * (i % 7)) for i in range(100)],
+        tree=True,
+        max_workers=16,
+    )
+
+    combines = []
+    map_reduce.on("before:receive", combines.append)
+
+    (response,) = llegos.message_send(request(map_reduce))
+    assert response.sources == sorted(f"source {i}" for i in range(100))
+
+    """
+    Combining goes through the scene's receive_combine handler, so it can be observed
+    like any other message: a tree over 100 partial results takes 99 combines.
+    """
+    assert sum(isinstance(message, Combine) for message in combines) == 99
+
+
+def test_early_termination():
+    """
+    The slowest mapper is never waited on once there are enough sources.
+    """
+    map_reduce = SourcesMapReduce(
+        [
+            Mapper(sources=["Doctor Who"]),
+            Mapper(sources=["Star Trek"], latency=0.01),
+            Mapper(sources=["Star Wars"], latency=1.0),
+        ],
+        enough=2,
+    )
+
+    started = perf_counter()
+    (response,) = llegos.message_send(request(map_reduce))
+    assert perf_counter() - started < 0.5
+    assert response.sources == ["Doctor Who", "Star Trek"]
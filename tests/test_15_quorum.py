@@ -0,0 +1,104 @@
+"""
+In test_5_contract_net, the manager asks each contractor for a proposal in turn, so one
+slow or dead contractor stalls the negotiation. llegos.concurrency.message_gather sends
+the call for proposals to every contractor at once, and stops collecting on a quorum,
+a deadline, or a good enough proposal.
+"""
+
+from time import perf_counter, sleep
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.concurrency import message_gather
+
+
+class CallForProposal(llegos.Message):
+    task: str
+
+
+class Propose(llegos.Message):
+    steps: int
+
+
+class Contractor(llegos.Actor):
+    steps: int
+    latency: float = Field(default=0.0)
+    dead: bool = Field(default=False)
+
+    def receive_call_for_proposal(self, message: CallForProposal):
+        sleep(self.latency)
+        if self.dead:
+            raise ConnectionError(self.id)
+        return Propose.reply_to(message, steps=self.steps)
+
+
+class Manager(llegos.Actor):
+    ...
+
+
+class Negotiation(llegos.Scene):
+    def __init__(self, manager: Manager, contractors: list[Contractor]):
+        super().__init__(actors=[manager, *contractors])
+        for contractor in contractors:
+            self._graph.add_edge(manager, contractor)
+
+
+def call_for_proposal(manager: Manager) -> CallForProposal:
+    return CallForProposal(sender=llegos.Actor(), receiver=manager, task="do the thing")
+
+
+def negotiation():
+    manager = Manager()
+    contractors = [
+        Contractor(steps=1),
+        Contractor(steps=2, latency=0.01),
+        Contractor(steps=3, latency=0.02),
+        Contractor(steps=4, latency=0.5),
+        Contractor(steps=5, dead=True),
+    ]
+    return manager, contractors, Negotiation(manager, contractors)
+
+
+def test_quorum():
+    manager, contractors, scene = negotiation()
+
+    with scene:
+        started = perf_counter()
+        gathering = message_gather(call_for_proposal(manager), quorum=3)
+        assert perf_counter() - started < 0.4
+
+    assert gathering.reason == "quorum"
+    assert sorted(p.steps for p in gathering.replies) == [1, 2, 3]
+    assert len(gathering.errors) == 1, "the dead contractor doesn't stall anyone"
+    assert gathering.pending == [contractors[3]]
+
+    """
+    The slow contractor's proposal is recorded for audit when it eventually arrives.
+    """
+    sleep(0.6)
+    assert [p.steps for p in gathering.late] == [4]
+
+
+def test_deadline():
+    manager, contractors, scene = negotiation()
+
+    with scene:
+        gathering = message_gather(call_for_proposal(manager), timeout=0.2)
+
+    assert gathering.reason == "deadline"
+    assert sorted(p.steps for p in gathering.replies) == [1, 2, 3]
+
+
+def test_score_threshold():
+    manager, contractors, scene = negotiation()
+
+    with scene:
+        gathering = message_gather(
+            call_for_proposal(manager),
+            score=lambda proposal: proposal.steps,
+            threshold=2,
+        )
+
+    assert gathering.reason == "threshold"
+    assert max(p.steps for p in gathering.replies) == 2
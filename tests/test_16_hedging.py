@@ -0,0 +1,79 @@
+"""
+When several actors can serve the same request, like replicated Mappers or LLM providers
+behind one interface, llegos.concurrency.Hedge sends the request to a second replica if
+the first one is slow, and takes whichever replies first.
+"""
+
+from time import perf_counter, sleep
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.concurrency import Hedge
+
+
+class MapRequest(llegos.Message):
+    query: str
+
+
+class MapResponse(llegos.Message):
+    sources: list[str]
+
+
+class Replica(llegos.Actor):
+    name: str
+    latency: float = Field(default=0.0)
+
+    def receive_map_request(self, request: MapRequest):
+        sleep(self.latency)
+        return MapResponse.reply_to(request, sources=[self.name])
+
+
+def request() -> MapRequest:
+    return MapRequest(sender=llegos.Actor(), receiver=llegos.Actor(), query="Query?")
+
+
+def test_fixed_delay_hedging():
+    slow, fast = Replica(name="slow", latency=1.0), Replica(name="fast")
+    hedge = Hedge(delay=0.05)
+
+    started = perf_counter()
+    (response,) = hedge.send(request(), receivers=[slow, fast])
+    assert perf_counter() - started < 0.5
+
+    assert response.sources == ["fast"]
+    assert (hedge.requests, hedge.hedged, hedge.hedge_wins) == (1, 1, 1)
+
+
+def test_no_hedging_when_the_primary_is_fast():
+    primary, secondary = Replica(name="primary"), Replica(name="secondary")
+    hedge = Hedge(delay=0.5)
+
+    for _ in range(5):
+        (response,) = hedge.send(request(), receivers=[primary, secondary])
+        assert response.sources == ["primary"]
+
+    assert hedge.hedge_rate == 0.0
+
+
+def test_percentile_delay():
+    """
+    Without a fixed delay, requests are hedged once they take longer than the 95th
+    percentile of the latencies measured so far.
+    """
+    primary, secondary = Replica(name="primary", latency=0.01), Replica(
+        name="secondary"
+    )
+    hedge = Hedge(percentile=95, min_samples=10)
+    replicas = [primary, secondary]
+
+    assert hedge.delay() is None
+    for _ in range(10):
+        hedge.send(request(), receivers=replicas)
+    assert hedge.hedged == 0
+    assert 0.01 <= hedge.delay() < 0.1
+
+    primary.latency = 1.0
+    (response,) = hedge.send(request(), receivers=replicas)
+    assert response.sources == ["secondary"]
+    assert hedge.win_rate == 1.0
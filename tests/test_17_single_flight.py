@@ -0,0 +1,90 @@
+"""
+When many conversations send the same request to the same actor at the same moment,
+llegos.concurrency.SingleFlight runs the handler once, and hands every caller its own
+reply. Use it directly, or as the applicator of llegos.message_propogate.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import sleep
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.concurrency import SingleFlight, fields_key
+
+
+class MapRequest(llegos.Message):
+    query: str
+
+
+class MapResponse(llegos.Message):
+    sources: list[str]
+
+
+class Mapper(llegos.Actor):
+    sources: list[str]
+    executions: int = Field(default=0)
+
+    def receive_map_request(self, request: MapRequest):
+        self.executions += 1
+        sleep(0.2)
+        return MapResponse.reply_to(request, sources=self.sources)
+
+
+def concurrently(single_flight: SingleFlight, requests: list[MapRequest]):
+    barrier = Barrier(len(requests))
+
+    def send(request: MapRequest):
+        barrier.wait()
+        return list(single_flight.send(request))
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        return list(pool.map(send, requests))
+
+
+def test_identical_requests_share_one_execution():
+    mapper = Mapper(sources=["Doctor Who", "Star Wars"])
+    single_flight = SingleFlight()
+    requests = [
+        MapRequest(sender=llegos.Actor(), receiver=mapper, query="Query?")
+        for _ in range(10)
+    ]
+
+    replies = concurrently(single_flight, requests)
+
+    assert mapper.executions == 1
+    assert (single_flight.executions, single_flight.coalesced) == (1, 9)
+
+    for request, (reply,) in zip(requests, replies):
+        assert reply.sources == ["Doctor Who", "Star Wars"]
+        assert reply.parent is request
+        assert reply.receiver is request.sender
+    assert len({reply.id for (reply,) in replies}) == 10
+
+
+def test_different_requests_are_not_coalesced():
+    mapper = Mapper(sources=["Doctor Who"])
+    requests = [
+        MapRequest(sender=llegos.Actor(), receiver=mapper, query=f"Query {i}?")
+        for i in range(3)
+    ]
+
+    concurrently(SingleFlight(), requests)
+    assert mapper.executions == 3
+
+
+def test_key_function():
+    mapper = Mapper(sources=["Doctor Who"])
+    requests = [
+        MapRequest(
+            sender=llegos.Actor(), receiver=mapper, query="Query?", metadata={"i": i}
+        )
+        for i in range(3)
+    ]
+
+    concurrently(SingleFlight(), requests)
+    assert mapper.executions == 3, "metadata is part of the content"
+
+    concurrently(SingleFlight(key=fields_key("query")), requests)
+    assert mapper.executions == 4
@@ -0,0 +1,71 @@
+"""
+llegos.diagnostics reports what a Scene keeps alive: its graph, its actors' listeners,
+and the messages (and conversations) reachable from it. Snapshots of every live Object
+in the process can be diffed to find growth in long-running services.
+"""
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.diagnostics import class_defaults_report, scene_report, snapshot
+
+
+class ChatMessage(llegos.Message):
+    content: str
+
+
+class Historian(llegos.Actor):
+    """
+    An actor that keeps every message it receives, a common source of leaks.
+    """
+
+    history: list[llegos.Message] = Field(default_factory=list)
+
+    def receive_chat_message(self, message: ChatMessage):
+        self.history.append(message)
+        return message.reply(content=message.content)
+
+
+def test_scene_report():
+    a1, a2 = Historian(), Historian()
+    scene = llegos.Scene(actors=[a1, a2])
+    a1.on("before:receive", lambda _message: None)
+
+    for sender, topic in [(a1, "weather"), (Historian(), "sports")]:
+        message = ChatMessage(sender=sender, receiver=a2, content=topic)
+        for _, _ in zip(llegos.message_propogate(message), range(3)):
+            ...
+
+    report = scene_report(scene)
+    assert report.actors == 2, "the outside sender isn't one of the scene's actors"
+    assert (report.nodes, report.edges) == (3, 2)
+    assert report.listeners == {a1.id: 1, a2.id: 0}
+
+    assert report.messages == 8, "4 received messages per conversation, 2 conversations"
+    assert sorted(report.conversations.values()) == [4, 4]
+    assert report.message_classes["ChatMessage"].count == 8
+    assert report.message_classes["ChatMessage"].bytes > 0
+
+
+def test_class_defaults_stay_empty():
+    llegos.Scene(actors=[llegos.Actor()])
+    assert class_defaults_report() == {
+        "scene_graph_nodes": 0,
+        "scene_graph_edges": 0,
+        "actor_listeners": 0,
+    }
+
+
+def test_snapshot_diff():
+    before = snapshot()
+    historian = Historian()
+    historian.history.extend(
+        ChatMessage(sender=historian, receiver=historian, content=str(i))
+        for i in range(50)
+    )
+    after = snapshot()
+
+    growth = after.diff(before)
+    assert growth["ChatMessage"].count == 50
+    assert growth["Historian"].count == 1
+    assert growth["ChatMessage"].bytes > 0
@@ -0,0 +1,166 @@
+"""
+A llegos.registry.LazyScene holds descriptors instead of actors, so a simulation of a
+hundred thousand agents only pays for the handful that are actually messaged.
+"""
+
+from time import perf_counter
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.registry import LazyScene
+
+
+class Gossip(llegos.Message):
+    rumor: str
+
+
+class Villager(llegos.Actor):
+    heard: list[str] = Field(default_factory=list)
+
+    def receive_gossip(self, message: Gossip):
+        self.heard.append(message.rumor)
+
+
+class Hermit(llegos.Actor):
+    ...
+
+
+def village(size: int, capacity: int) -> LazyScene:
+    scene = LazyScene(capacity=capacity)
+    for i in range(size):
+        scene.register(Villager if i % 10 else Hermit, id=f"villager_{i}")
+    for i in range(size - 1):
+        scene.relate(f"villager_{i}", f"villager_{i + 1}", weight=i % 3)
+    return scene
+
+
+def gossip(receiver: llegos.Actor, rumor: str) -> Gossip:
+    return Gossip(sender=llegos.Actor(), receiver=receiver, rumor=rumor)
+
+
+def test_large_scenes_start_quickly():
+    started = perf_counter()
+    scene = village(100_000, capacity=100)
+    assert perf_counter() - started < 10
+
+    assert len(scene) == 100_000
+    assert "villager_99999" in scene
+    assert scene.stats["materializations"] == 0
+
+    villager = scene["villager_5"]
+    assert isinstance(villager, Villager)
+    assert scene["villager_5"] is villager
+    assert scene.stats["materializations"] == 1
+
+    """
+    Like any Scene's, the directory maps ids to actors, materializing them on lookup.
+    """
+    assert len(scene.directory) == 100_000
+    assert scene.directory["villager_5"] is villager
+    assert isinstance(scene.directory["villager_6"], Villager)
+    assert scene.stats["materializations"] == 2
+
+
+def test_eviction_stays_cheap_past_capacity():
+    scene = village(6_000, capacity=1_000)
+    started = perf_counter()
+    for i in range(6_000):
+        scene[f"villager_{i}"]
+    assert perf_counter() - started < 10
+    assert scene.stats["materialized"] == 1_000
+    assert scene.stats["hibernations"] == 5_000
+
+
+def test_receivers_are_filtered_before_materializing():
+    scene = village(1_000, capacity=100)
+
+    with scene:
+        villager = scene["villager_9"]
+        """
+        villager_10 is a Hermit, so only villager_8 is materialized as a receiver.
+        """
+        assert [r.id for r in villager.receivers(Gossip)] == ["villager_8"]
+        assert "villager_10" not in scene._materialized
+        assert [r.id for r, _key, _data in villager.relationships] == [
+            "villager_8",
+            "villager_10",
+        ]
+        assert villager.top_receivers(Gossip)[0].id == "villager_8"
+
+
+def test_idle_actors_are_hibernated_and_restored():
+    scene = village(100, capacity=3)
+
+    for i in range(1, 6):
+        list(llegos.message_send(gossip(scene[f"villager_{i}"], f"rumor {i}")))
+
+    assert len(scene.materialized) == 3
+    assert scene.stats["hibernations"] == 2
+
+    """
+    A hibernated villager remembers what it heard.
+    """
+    villager = scene["villager_1"]
+    assert villager.heard == ["rumor 1"]
+    assert scene.stats["materializations"] == 6
+
+
+def test_busy_actors_are_not_evicted():
+    scene = LazyScene(capacity=1)
+
+    class Introducer(llegos.Actor):
+        def receive_gossip(self, message: Gossip):
+            for i in range(3):
+                scene[f"villager_{i}"]
+            assert self.id in scene._materialized
+
+    scene.register(Introducer, id="introducer")
+    for i in range(3):
+        scene.register(Villager, id=f"villager_{i}")
+
+    list(llegos.message_send(gossip(scene["introducer"], "hello")))
+    assert "introducer" in scene._materialized
+
+
+def test_actors_are_idle_however_their_handlers_end():
+    scene = LazyScene(capacity=1)
+
+    class Boom(llegos.Actor):
+        def receive_gossip(self, message: Gossip):
+            raise RuntimeError(message.rumor)
+
+    class Chatterbox(llegos.Actor):
+        def receive_gossip(self, message: Gossip):
+            yield message.reply(rumor="one")
+            yield message.reply(rumor="two")
+
+    scene.register(Boom, id="boom")
+    scene.register(Chatterbox, id="chatterbox")
+
+    try:
+        list(llegos.message_send(gossip(scene["boom"], "!")))
+        assert False, "the handler raised"
+    except RuntimeError:
+        pass
+    next(llegos.message_send(gossip(scene["chatterbox"], "?")))
+    assert scene._busy == {}
+
+
+def test_one_instance_per_id():
+    """
+    A hibernated actor that older messages still refer to is restored, not rebuilt, so
+    messages sent through them and lookups agree on its state.
+    """
+    scene = village(10, capacity=1)
+    old = scene["villager_1"]
+    other = scene["villager_2"]
+    assert "villager_1" not in scene._materialized
+
+    list(llegos.message_send(gossip(old, "psst")))
+    assert scene["villager_1"] is old
+    assert old.heard == ["psst"]
+
+    assert scene["villager_2"] is other
+    assert scene["villager_1"] is old
+    assert scene.stats["materializations"] == 2
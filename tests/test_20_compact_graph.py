@@ -0,0 +1,106 @@
+"""
+A Scene's graph is pluggable. The default SceneGraph is a networkx MultiGraph, and
+llegos.graphs.CompactGraph stores the same relationships in NumPy columns, for scenes
+with hundreds of thousands of actors and edges.
+"""
+
+import tracemalloc
+
+from test_8_weighted_routing import Dispatcher, Pool, Task, Worker
+
+from llegos import research as llegos
+from llegos.graphs import CompactGraph
+
+
+class CompactPool(Pool):
+    _graph = CompactGraph()
+
+
+def test_compact_pool_routes_like_a_pool():
+    dispatcher = Dispatcher()
+    workers = [Worker() for _ in range(5)]
+    weights = [3, 5, 1, 4, 2]
+    pool, compact = Pool(dispatcher, workers, weights), CompactPool(
+        dispatcher, workers, weights
+    )
+    assert isinstance(compact._graph, CompactGraph)
+
+    for scene in (pool, compact):
+        with scene:
+            assert dispatcher.receivers(Task) == [
+                workers[1],
+                workers[3],
+                workers[0],
+                workers[4],
+                workers[2],
+            ]
+            assert dispatcher.top_receivers(Task, k=3) == [
+                workers[1],
+                workers[3],
+                workers[0],
+            ]
+            assert [
+                data.get("weight") for _a, _k, data in dispatcher.relationships
+            ] == [
+                100,
+                5,
+                4,
+                3,
+                2,
+                None,  # the scene's own edge
+                1,
+            ]
+
+    with compact:
+        best = Worker()
+        compact._graph.add_edge(dispatcher, best, weight=10)
+        assert dispatcher.top_receivers(Task) == [best]
+
+        compact._graph.remove_node(best)
+        assert dispatcher.top_receivers(Task) == [workers[1]]
+
+        compact._graph.remove_edge(dispatcher, workers[1])
+        assert dispatcher.top_receivers(Task) == [workers[3]]
+
+
+def test_round_trip_through_networkx():
+    dispatcher = Dispatcher()
+    workers = [Worker() for _ in range(3)]
+    compact = CompactPool(dispatcher, workers, [1, 2, 3])
+
+    graph = compact._graph.to_networkx()
+    assert graph.number_of_nodes() == compact._graph.number_of_nodes() == 6
+    assert graph.number_of_edges() == compact._graph.number_of_edges() == 8
+
+    again = CompactGraph.from_networkx(graph)
+    assert [
+        (neighbor.id, data) for neighbor, _key, data in again.relationships(dispatcher)
+    ] == [
+        (neighbor.id, data) for neighbor, _key, data in graph.relationships(dispatcher)
+    ]
+
+
+def test_compact_graphs_are_compact():
+    actors = [llegos.Actor() for _ in range(10_000)]
+    edges = [
+        (actors[i % len(actors)], actors[(i * 7 + 1) % len(actors)], {"weight": i % 5})
+        for i in range(50_000)
+    ]
+
+    def allocated(graph):
+        tracemalloc.start()
+        graph.add_edges_from(edges)
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size
+
+    compact, networkx = CompactGraph(), llegos.SceneGraph()
+    assert allocated(compact) * 5 < allocated(networkx)
+
+    neighbors, weights = compact.neighbors(actors[1])
+    assert list(weights) == sorted(weights, reverse=True)
+    assert (
+        compact.degree(actors[1])
+        == len(neighbors)
+        == len(networkx.relationships(actors[1]))
+    )
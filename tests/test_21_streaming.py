@@ -0,0 +1,91 @@
+"""
+A handler can reply incrementally with llegos.Stream, so the first tokens of a reply reach
+the user before the rest has been generated, even through intermediaries.
+
+Streaming is opt-in: message_send and message_propogate only see the assembled reply,
+while message_stream also yields each Chunk as it is generated.
+"""
+
+from time import perf_counter, sleep
+
+from llegos import research as llegos
+
+
+class Ask(llegos.Message):
+    question: str
+
+
+class Answer(llegos.Message):
+    text: str
+
+
+class Model(llegos.Actor):
+    def receive_ask(self, ask: Ask):
+        stream = llegos.Stream(Answer, ask, field="text")
+        for token in ["The ", "answer ", "is ", "42"]:
+            sleep(0.05)
+            yield stream.chunk(token)
+        yield stream.finish()
+
+
+class Relay(llegos.Actor):
+    """
+    Relays the model's chunks as they arrive, instead of waiting for its answer.
+    """
+
+    model: Model
+
+    def receive_ask(self, ask: Ask):
+        stream = llegos.Stream(Answer, ask, field="text")
+        for reply in llegos.message_stream(ask.forward_to(self.model)):
+            match reply:
+                case llegos.Chunk():
+                    yield stream.chunk(reply.delta.upper())
+                case Answer():
+                    yield stream.finish()
+
+
+def test_streaming_through_a_relay():
+    user = llegos.Actor()
+    relay = Relay(model=Model())
+    ask = Ask(sender=user, receiver=relay, question="What is the answer?")
+
+    started = perf_counter()
+    first_token_at = None
+    chunks = []
+    for reply in llegos.message_stream(ask):
+        match reply:
+            case llegos.Chunk():
+                first_token_at = first_token_at or perf_counter() - started
+                chunks.append(reply)
+            case Answer():
+                answer = reply
+
+    assert first_token_at < 0.1 < perf_counter() - started
+    assert [chunk.index for chunk in chunks] == [0, 1, 2, 3]
+    assert "".join(chunk.delta for chunk in chunks) == answer.text == "THE ANSWER IS 42"
+
+    """
+    Chunks carry the id of the reply they assemble into, and are addressed like it.
+    """
+    assert {chunk.id for chunk in chunks} == {answer.id}
+    assert chunks[0].receiver == answer.receiver == user
+    assert answer.parent == ask
+
+
+def test_streaming_is_opt_in():
+    model = Model()
+    chunks = []
+    model.on("chunk", chunks.append)
+
+    ask = Ask(sender=llegos.Actor(), receiver=model, question="What is the answer?")
+    (answer,) = llegos.message_send(ask)
+    assert answer.text == "The answer is 42"
+    assert [chunk.delta for chunk in chunks] == ["The ", "answer ", "is ", "42"]
+
+    """
+    Calling an actor directly is the same: only stream() yields chunks.
+    """
+    (answer,) = model.send(ask)
+    assert isinstance(answer, Answer)
+    assert [type(reply) for reply in model.stream(ask)] == [llegos.Chunk] * 4 + [Answer]
@@ -0,0 +1,86 @@
+"""
+llegos.history.MessageHistory records messages into SQLite in the background, so past
+runs can be analysed with indexed queries instead of walking parent pointers in memory.
+"""
+
+from datetime import datetime, timedelta
+
+from test_1_dialogue import ChatBot, ChatMessage
+
+from llegos import research as llegos
+from llegos.history import MessageHistory
+
+
+def dialogue(a1: ChatBot, a2: ChatBot, turns: int) -> list[llegos.Message]:
+    first = ChatMessage(content="Hello", sender=a1, receiver=a2)
+    return [
+        first,
+        *(m for m, _ in zip(llegos.message_propogate(first), range(turns - 1))),
+    ]
+
+
+def test_history(tmp_path):
+    a1, a2 = ChatBot(response="Hello"), ChatBot(response="Hi")
+
+    with MessageHistory(str(tmp_path / "history.db"), batch_size=16) as history:
+        history.watch(a1, a2)
+        messages = dialogue(a1, a2, turns=100)
+        history.flush()
+
+        assert len(history) == 100
+        assert history.batches < 100, "messages are written in batches"
+
+        first, last = messages[0], messages[-1]
+        stored = history.get(last.id)
+        assert stored.root_id == first.id
+        assert stored.parent_id == messages[-2].id
+        assert stored.cls == "ChatMessage"
+        assert stored.body["content"] == last.content
+        assert "parent" not in stored.body
+
+        """
+        Ancestry and subtree queries are answered by SQLite.
+        """
+        ancestors = history.ancestors(last.id)
+        assert [m.id for m in ancestors] == [m.id for m in reversed(messages[:-1])]
+        assert [m.depth for m in ancestors[:3]] == [1, 2, 3]
+
+        subtree = history.subtree(messages[97].id)
+        assert [(m.id, m.depth) for m in subtree] == [
+            (messages[97].id, 0),
+            (messages[98].id, 1),
+            (messages[99].id, 2),
+        ]
+        assert len(history.subtree(first.id, max_depth=9)) == 10
+
+        assert len(history.conversation(first.id)) == 100
+        assert len(history.query(sender=a1)) == 50
+        assert len(history.query(receiver=a1.id, cls=ChatMessage, limit=10)) == 10
+        assert history.query(since=datetime.utcnow() + timedelta(days=1)) == []
+
+
+def test_history_persists(tmp_path):
+    path = str(tmp_path / "history.db")
+    a1, a2 = ChatBot(response="Hello"), ChatBot(response="Hi")
+
+    with MessageHistory(path) as history:
+        for message in dialogue(a1, a2, turns=10):
+            history.record(message)
+
+    with MessageHistory(path) as history:
+        assert len(history) == 10
+
+
+def test_unserializable_messages_are_skipped():
+    a1, a2 = ChatBot(response="Hello"), ChatBot(response="Hi")
+    with MessageHistory() as history:
+        history.record(
+            ChatMessage(sender=a1, receiver=a2, content="?", metadata={"x": object()})
+        )
+        for message in dialogue(a1, a2, turns=4):
+            history.record(message)
+        history.flush()
+
+        assert history.failed == 1
+        assert len(history) == 4
+        assert history._writer.is_alive()
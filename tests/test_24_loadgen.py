@@ -0,0 +1,38 @@
+"""
+llegos-loadgen builds synthetic scenes from topology templates, and drives them at a
+target concurrency or rate, to see how llegos behaves under realistic traffic.
+
+    llegos-loadgen debate --actors 4 --rounds 2 --rate 50 --duration 5
+"""
+
+import json
+
+import pytest
+
+from llegos.loadgen import Worker, drive, main, topologies
+
+
+@pytest.mark.parametrize("topology", sorted(topologies))
+def test_topologies(topology, capsys):
+    main([topology, "--requests", "20", "--duration", "5", "--latency", "0", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["requests"] == 20
+    assert report["errors"] == 0
+    assert report["units"] >= 20
+    assert set(report["latencies"]) == {"p50", "p90", "p99", "max"}
+    assert len(report["memory"]) >= 2
+
+
+def test_target_rate():
+    report = drive(Worker(latency=0.001), duration=0.5, concurrency=4, rate=40)
+    assert 15 <= report.requests <= 25
+    assert report.latencies["p50"] < 0.05
+
+
+def test_closed_loop_concurrency():
+    """
+    With 5ms of latency and 8 concurrent senders, throughput approaches 1600/s.
+    """
+    report = drive(Worker(latency=0.005), duration=0.5, concurrency=8)
+    assert report.throughput > 400
+    assert report.latencies["p50"] >= 0.005
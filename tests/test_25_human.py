@@ -0,0 +1,129 @@
+"""
+Unlike the ShellHuman in test_2_human_console, a llegos.human.Human doesn't block on
+input. Its conversations are parked until a person responds, from a console, a socket,
+or a queue, so thousands of them can wait on people without holding any threads.
+"""
+
+import json
+import socket
+from queue import Queue
+
+from test_2_human_console import ShellBot, ShellMessage
+
+from llegos import research as llegos
+from llegos.human import Desk, Human, NotParked
+
+
+def converse(human: Human, bot: ShellBot) -> list[llegos.Message]:
+    return list(
+        llegos.message_propogate(ShellMessage(sender=human, receiver=bot, content="Hi"))
+    )
+
+
+def test_conversations_park_and_resume():
+    human, bot = Human(), ShellBot()
+
+    """
+    The bot replies to the human, and the conversation parks instead of blocking.
+    """
+    (reply,) = converse(human, bot)
+    assert human.parked == [reply]
+
+    response, bot_reply = human.respond(reply.id, content="How are you?")
+    assert response.parent == reply
+    assert bot_reply.content == "Bot received: How are you?"
+    assert human.parked == [bot_reply]
+
+    try:
+        list(human.respond(reply.id, content="again"))
+        assert False, "a message can only be responded to once"
+    except NotParked:
+        pass
+
+
+def test_many_conversations_wait_on_a_queue():
+    human, bot = Human(), ShellBot()
+    for _ in range(1_000):
+        converse(human, bot)
+    assert len(human.parked) == 1_000
+
+    followups = []
+    desk = Desk(human, on_message=followups.append)
+    queue = Queue()
+    for message in human.parked[:500]:
+        queue.put((message.id, {"content": "ok"}))
+    for message in human.parked[500:]:
+        queue.put(f"{message.id} fine")
+
+    assert desk.pump(queue) == 1_000
+    assert len(followups) == 2_000
+    assert (
+        len(human.parked) == 1_000
+    ), "each conversation parks again on the bot's reply"
+    assert {m.content for m in human.parked} == {
+        "Bot received: ok",
+        "Bot received: fine",
+    }
+
+
+def test_resume_in_the_scene_it_parked_in():
+    human, bot = Human(), ShellBot()
+    scene = llegos.Scene(actors=[human, bot])
+
+    with scene:
+        (reply,) = converse(human, bot)
+
+    scenes = []
+    bot.on("before:receive", lambda _message: scenes.append(bot.scene))
+    Desk(human).feed([f"{reply.id} Still here?\n"])
+    assert scenes == [scene]
+
+    """
+    Between steps, the scenes it resumes in don't leak into the caller's, so closing
+    a partly consumed conversation inside another scene leaves that scene entered.
+    """
+    (reply,) = human.parked
+    other = llegos.Scene(actors=[human])
+    with other:
+        conversation = human.respond(reply.id, content="Bye")
+        next(conversation)
+        assert llegos.scene_context.get() == (other,)
+        next(conversation)
+        assert llegos.scene_context.get() == (other,)
+        conversation.close()
+        assert llegos.scene_context.get() == (other,)
+    assert llegos.scene_context.get() == ()
+
+
+def test_socket(tmp_path):
+    human, bot = Human(), ShellBot()
+    (reply,) = converse(human, bot)
+
+    server = Desk(human).serve(str(tmp_path / "human.sock"))
+    try:
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(str(tmp_path / "human.sock"))
+            stream = client.makefile("rwb")
+            stream.write(
+                json.dumps({"id": reply.id, "content": "Hello"}).encode() + b"\n"
+            )
+            stream.write(b"unknown_id Hello\n")
+            stream.flush()
+
+            response, bot_reply = json.loads(stream.readline())
+            assert bot_reply["content"] == "Bot received: Hello"
+            assert "NotParked" in json.loads(stream.readline())["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_humans_can_be_routed_to():
+    human, bot = Human(), ShellBot()
+    with llegos.Scene(actors=[human, bot]) as scene:
+        scene._graph.add_edge(bot, human)
+        assert bot.receivers(ShellMessage) == [human]
+        assert human.can_receive(ShellMessage(sender=bot, receiver=human, content="?"))
+        assert not human.can_receive(
+            ShellMessage(sender=human, receiver=bot, content="?")
+        )
@@ -0,0 +1,120 @@
+"""
+Listeners on actors' events run synchronously, on every message. A llegos.events.EventSink
+queues events instead, and delivers them to its subscribers in batches on a background
+thread, so logging and analytics don't add to message latency.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+
+from test_1_dialogue import ChatBot, ChatMessage
+
+from llegos import research as llegos
+from llegos.events import EventSink, LifecycleEvent
+
+
+def chat(a1: ChatBot, a2: ChatBot, n: int):
+    first = ChatMessage(content="Hello", sender=a1, receiver=a2)
+    for _ in zip(llegos.message_propogate(first), range(n - 1)):
+        ...
+
+
+def test_slow_subscribers_stay_off_the_critical_path():
+    batches: list[list[LifecycleEvent]] = []
+
+    def slow_subscriber(batch: list[LifecycleEvent]):
+        sleep(0.05)
+        batches.append(batch)
+
+    a1, a2 = ChatBot(response="Hello"), ChatBot(response="Hi")
+    with EventSink(slow_subscriber, batch_size=64) as sink:
+        sink.attach(a1, a2)
+
+        started = perf_counter()
+        chat(a1, a2, 200)
+        assert perf_counter() - started < 0.5
+
+        assert sink.flush(timeout=5)
+        assert sink.enqueued == sink.delivered == sum(map(len, batches)) >= 200
+        assert sink.dropped == 0
+        assert len(batches) < 10, "events are delivered in batches"
+
+    assert batches[0][0].name == "before:receive"
+    assert batches[0][0].args[0].content == "Hello"
+
+
+def event(i: int) -> LifecycleEvent:
+    return LifecycleEvent("tick", llegos.Actor(), (i,), 0.0)
+
+
+def stopped(sink: EventSink) -> EventSink:
+    "Stop the sink's drainer, so the test can fill its queue and drain it by hand."
+    sink.close()
+    return sink
+
+
+def test_drop_policies():
+    received = []
+
+    sink = stopped(
+        EventSink(lambda batch: received.extend(e.args[0] for e in batch), maxsize=10)
+    )
+
+    accepted = [sink.put(event(i)) for i in range(15)]
+    assert accepted == [True] * 10 + [False] * 5
+    assert sink.dropped == 5
+    sink._deliver_all()
+    assert received == list(range(10))
+
+    received.clear()
+    sink = stopped(
+        EventSink(
+            lambda batch: received.extend(e.args[0] for e in batch),
+            maxsize=10,
+            policy="drop_oldest",
+        )
+    )
+
+    for i in range(15):
+        sink.put(event(i))
+    assert sink.dropped == 5
+    sink._deliver_all()
+    assert received == list(range(5, 15))
+
+    """
+    Concurrent emitters never push the queue past its bound, and once the sink is
+    closed, flush() delivers what's left itself instead of waiting on the drainer.
+    """
+    received.clear()
+    sink = stopped(
+        EventSink(lambda batch: received.extend(e.args[0] for e in batch), maxsize=10)
+    )
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        accepted = list(pool.map(sink.put, map(event, range(1000))))
+    assert accepted.count(True) == sink.pending == 10
+    assert sink.dropped == 990
+    assert sink.flush()
+    assert len(received) == sink.delivered == 10
+
+
+def test_backpressure():
+    received = []
+
+    def subscriber(batch):
+        sleep(0.01)
+        received.extend(e.args[0] for e in batch)
+
+    with EventSink(subscriber, maxsize=10, batch_size=5, policy="block") as sink:
+        for i in range(100):
+            assert sink.put(event(i))
+        sink.flush()
+
+    assert sink.dropped == 0
+    assert received == list(range(100))
+
+    with EventSink(
+        lambda batch: sleep(1), maxsize=10, policy="block", block_timeout=0.01
+    ) as sink:
+        accepted = [sink.put(event(i)) for i in range(30)]
+        assert not all(accepted)
+        assert sink.dropped == accepted.count(False)
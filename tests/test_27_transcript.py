@@ -0,0 +1,128 @@
+"""
+The Debate in test_3_debate copies every response so far into each message it forwards,
+so its cost grows quadratically with rounds × debaters. A llegos.transcript.Transcript
+is appended to once and shared by reference: debaters get a TranscriptView of it, which
+costs the same to forward and serialize however long the debate has run.
+"""
+
+import json
+from random import random
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.transcript import Transcript, TranscriptView
+
+
+class Proposition(llegos.Message):
+    content: str
+    transcript: TranscriptView
+
+
+class Rebuttal(llegos.Message):
+    content: str
+
+
+class Agreement(llegos.Message):
+    content: str
+
+
+class Debater(llegos.Actor):
+    seen: list[int] = Field(default_factory=list)
+
+    def receive_proposition(self, message: Proposition):
+        self.seen.append(len(message.transcript))
+        if random() < 0.5:
+            return Rebuttal.reply_to(message, content="I disagree")
+        return Agreement.reply_to(message, content="I agree")
+
+
+class Debate(llegos.Scene):
+    rounds: int = Field(ge=1)
+    debaters: list[Debater]
+    _transcript: Transcript
+
+    def __init__(self, debaters: list[Debater], **kwargs):
+        super().__init__(debaters=debaters, actors=debaters, **kwargs)
+
+    def receive_proposition(self, message: Proposition):
+        self._transcript = transcript = Transcript()
+        for _round in range(self.rounds):
+            snapshot = transcript.view()
+            for debater in self.debaters:
+                transcript.extend(
+                    llegos.message_send(
+                        message.forward_to(debater, transcript=snapshot)
+                    )
+                )
+            transcript.end_round()
+        return Agreement.reply_to(message, content=f"{len(transcript)} responses")
+
+
+def test_debate():
+    debaters = [Debater(), Debater(), Debater()]
+    debate = Debate(debaters, rounds=4)
+    proposition = Proposition(
+        sender=llegos.Actor(),
+        receiver=debate,
+        content="Apple pie is the best",
+        transcript=Transcript().view(),
+    )
+
+    (verdict,) = llegos.message_send(proposition)
+    assert verdict.content == "12 responses"
+
+    """
+    Every debater saw the transcript as it stood at the start of each round.
+    """
+    assert all(debater.seen == [0, 3, 6, 9] for debater in debaters)
+
+    transcript = debate._transcript
+    assert transcript.rounds == 4
+    assert [len(transcript.round(i)) for i in range(4)] == [3, 3, 3, 3]
+    assert transcript.round(1)[0].sender == debaters[0]
+    assert transcript.round(3).by(debaters[2]) == [transcript.view()[-1]]
+    assert len(transcript.round(-1)) == 0, "the round in progress"
+
+    delta = json.loads(transcript.delta_json(2))
+    assert delta["round"] == 2 and delta["start"] == 6
+    assert len(delta["entries"]) == 3
+
+
+def test_views_are_shared_not_copied():
+    transcript = Transcript()
+    user, debater = llegos.Actor(), Debater()
+    first = Proposition(
+        sender=user, receiver=debater, content="?", transcript=transcript.view()
+    )
+    transcript.append(first)
+
+    for _ in range(100):
+        transcript.append(Agreement(sender=debater, receiver=user, content="I agree"))
+    view = transcript.end_round()
+
+    forward = first.forward_to(debater, transcript=view)
+    reply = forward.reply(content="!")
+    assert reply.transcript is view
+    assert reply.transcript[1].content == "I agree"
+
+    """
+    Serialized, a view is a reference, which resolves back to the same transcript.
+    """
+    dumped = json.loads(forward.model_dump_json())
+    assert dumped["transcript"] == {
+        "transcript": transcript.id,
+        "start": 0,
+        "stop": 101,
+    }
+    assert (
+        Proposition.model_validate({**forward.model_dump(), **dumped}).transcript
+        == view
+    )
+
+    """
+    Replies of another class carry the view as an extra field, still as a reference.
+    """
+    rebuttal = Rebuttal.reply_to(forward, content="No")
+    assert rebuttal.transcript is view
+    assert json.loads(str(rebuttal))["transcript"] == dumped["transcript"]
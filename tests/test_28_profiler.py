@@ -0,0 +1,66 @@
+"""
+llegos.profiler.SamplingProfiler attributes CPU time to the actors, handlers and message
+classes that spent it, rather than to the pydantic and networkx internals they call.
+"""
+
+from time import perf_counter, sleep
+
+from llegos import research as llegos
+from llegos.profiler import SamplingProfiler
+
+
+class Work(llegos.Message):
+    ...
+
+
+class Busy(llegos.Actor):
+    def receive_work(self, work: Work):
+        until = perf_counter() + 0.02
+        while perf_counter() < until:
+            pass
+
+
+class Idle(llegos.Actor):
+    def receive_work(self, work: Work):
+        sleep(0.02)
+
+
+class Office(llegos.Scene):
+    def receive_work(self, work: Work):
+        with self:
+            for worker in self.receivers(Work):
+                list(llegos.message_send(work.forward_to(worker)))
+
+
+def test_profiler(tmp_path):
+    busy, idle = Busy(), Idle()
+    office = Office(actors=[busy, idle])
+
+    with SamplingProfiler(interval=0.002) as profiler:
+        for _ in range(10):
+            list(llegos.message_send(Work(sender=llegos.Actor(), receiver=office)))
+
+    assert profiler.samples > 10
+
+    by_actor = {}
+    for row in profiler.table():  # most time first
+        by_actor.setdefault(row.actor, row)
+    assert by_actor["Busy"].self_seconds > 0.1
+    assert by_actor["Busy"].handler == "receive_work"
+    assert by_actor["Busy"].message_class == "Work"
+    assert by_actor["Busy"].scene_id == office.id
+    assert by_actor["Office"].total_seconds >= by_actor["Busy"].self_seconds
+    assert by_actor.get("Idle") is None or by_actor["Idle"].self_seconds < 0.05
+
+    collapsed = profiler.collapsed()
+    assert any(
+        "[Office] receive_work(Work);" in line.split("[Busy] receive_work(Work)")[0]
+        for line in collapsed.splitlines()
+        if "[Busy] receive_work(Work)" in line
+    ), "Busy's stacks are nested under Office's"
+    stack, microseconds = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(microseconds) > 0
+
+    profiler.write_collapsed(tmp_path / "profile.folded")
+    assert (tmp_path / "profile.folded").read_text().startswith(stack)
+    assert profiler.format_table().splitlines()[1].startswith("Busy")
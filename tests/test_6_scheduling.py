@@ -0,0 +1,150 @@
+"""
+Messages carry an optional priority and deadline.
+
+llegos.message_schedule works like llegos.message_propogate, but instead of following
+replies depth-first, it queues them and delivers the highest priority message first,
+then the one with the earliest deadline. Expired messages are never delivered.
+"""
+
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from llegos import research as llegos
+
+
+class Proposition(llegos.Message):
+    content: str
+
+
+class Rebuttal(llegos.Message):
+    content: str
+
+
+class Timeout(llegos.Message):
+    ...
+
+
+class User(llegos.Actor):
+    def receive_timeout(self, message: Timeout):
+        ...
+
+
+class Debater(llegos.Actor):
+    received: list[str] = []
+
+    def receive_proposition(self, message: Proposition):
+        self.received.append(message.content)
+
+    def receive_rebuttal(self, message: Rebuttal):
+        self.received.append(message.content)
+
+
+def test_priority_jumps_the_queue():
+    user = llegos.Actor()
+    debater = Debater()
+
+    background = [
+        Rebuttal(sender=user, receiver=debater, content=f"rebuttal {i}")
+        for i in range(3)
+    ]
+    urgent = Proposition(sender=user, receiver=debater, content="urgent", priority=1)
+
+    list(llegos.message_schedule(*background, urgent))
+    assert debater.received == ["urgent", "rebuttal 0", "rebuttal 1", "rebuttal 2"]
+
+
+def test_earliest_deadline_first():
+    user = llegos.Actor()
+    debater = Debater()
+    now = datetime.utcnow()
+
+    later = Rebuttal(
+        sender=user,
+        receiver=debater,
+        content="later",
+        deadline=now + timedelta(hours=2),
+    )
+    sooner = Rebuttal(
+        sender=user,
+        receiver=debater,
+        content="sooner",
+        deadline=now + timedelta(hours=1),
+    )
+
+    list(llegos.message_schedule(later, sooner))
+    assert debater.received == ["sooner", "later"]
+
+
+def test_expired_messages_are_dropped():
+    user = llegos.Actor()
+    debater = Debater()
+    expired = Rebuttal(
+        sender=user,
+        receiver=debater,
+        content="too late",
+        deadline=datetime.utcnow() - timedelta(seconds=1),
+    )
+
+    expirations = []
+    debater.on("expired", expirations.append)
+
+    assert list(llegos.message_send(expired)) == []
+    assert debater.received == []
+    assert expirations == [expired]
+
+    """
+    on_expired lets you short-circuit an expired message, e.g. replying with a timeout.
+    """
+    timeout = next(
+        llegos.message_schedule(
+            expired,
+            on_expired=lambda message: [Timeout.reply_to(message, deadline=None)],
+        )
+    )
+    assert isinstance(timeout, Timeout)
+    assert timeout.receiver == user
+
+    """
+    Short-circuit replies inherit the deadline that just passed, so it is cleared
+    rather than expiring them again, and again.
+    """
+    replies = list(
+        islice(
+            llegos.message_schedule(
+                Rebuttal.lift(expired, sender=User()),
+                on_expired=lambda message: [Timeout.reply_to(message)],
+            ),
+            3,
+        )
+    )
+    assert len(replies) == 1
+    assert replies[0].deadline is None
+
+
+def test_aware_deadlines():
+    user = llegos.Actor()
+    debater = Debater()
+    message = Proposition(
+        sender=user,
+        receiver=debater,
+        content="aware",
+        deadline=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    assert message.deadline.tzinfo is None
+    assert message.expired
+    assert list(llegos.message_send(message)) == []
+
+
+def test_deadline_propagates_to_replies():
+    a1 = llegos.Actor()
+    a2 = llegos.Actor()
+    deadline = datetime.utcnow() + timedelta(minutes=1)
+
+    message = Proposition(sender=a1, receiver=a2, content="hi", deadline=deadline)
+    assert message.reply().deadline == deadline
+    assert message.forward_to(a1).deadline == deadline
+
+    """
+    Without a priority or deadline, neither is sent to the LLM.
+    """
+    assert "priority" not in str(message.reply(deadline=None))
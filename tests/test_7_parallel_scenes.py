@@ -0,0 +1,92 @@
+"""
+Scene contexts are a per-thread, per-task stack, so you can run many scenes in parallel,
+nest them, and re-enter them, without them stepping on each other.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from random import random
+from time import sleep
+
+import pytest
+
+from llegos import research as llegos
+from test_4_map_reduce import MapReducer, Mapper, MapRequest, Reducer
+
+
+def test_nested_and_reentrant_scenes():
+    outer = llegos.Scene(actors=[llegos.Actor()])
+    inner = llegos.Scene(actors=[llegos.Actor()])
+    actor = llegos.Actor()
+
+    with pytest.raises(llegos.MissingScene):
+        actor.scene
+
+    with outer:
+        with inner:
+            assert actor.scene == inner
+            with outer:
+                assert actor.scene == outer
+            assert actor.scene == inner
+        assert actor.scene == outer
+
+    assert llegos.scene_context.get() == ()
+
+
+def test_out_of_order_exit():
+    """
+    A generator can suspend inside a `with scene:` block while its consumer enters
+    another scene, so scenes may exit in a different order than they entered.
+    """
+    a = llegos.Scene(actors=[])
+    b = llegos.Scene(actors=[])
+    actor = llegos.Actor()
+
+    a.__enter__()
+    b.__enter__()
+    a.__exit__(None, None, None)
+    assert actor.scene == b
+    b.__exit__(None, None, None)
+    assert llegos.scene_context.get() == ()
+
+
+def run_map_reduce(index: int) -> list[str]:
+    nested = MapReducer(
+        Reducer(),
+        [Mapper(sources=[f"{index}:a", f"{index}:b"]), Mapper(sources=[f"{index}:c"])],
+    )
+    root = MapReducer(Reducer(), [nested, Mapper(sources=[f"{index}:d"])])
+
+    with root:
+        sleep(random() / 1000)  # encourage interleaving between threads
+        response = next(
+            llegos.message_send(
+                MapRequest(sender=llegos.Actor(), receiver=root, query="Query?")
+            )
+        )
+        assert root.reducer.scene == root
+    return sorted(response.sources)
+
+
+def test_parallel_scenes_across_threads():
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(run_map_reduce, range(200)))
+
+    for index, sources in enumerate(results):
+        assert sources == [f"{index}:{s}" for s in "abcd"]
+
+
+def test_parallel_scenes_across_tasks():
+    async def run(index: int):
+        scene = llegos.Scene(actors=[])
+        actor = llegos.Actor()
+        with scene:
+            for _ in range(10):
+                await asyncio.sleep(0)
+                assert actor.scene == scene
+        return index
+
+    async def main():
+        return await asyncio.gather(*[run(index) for index in range(200)])
+
+    assert asyncio.run(main()) == list(range(200))
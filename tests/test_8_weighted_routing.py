@@ -0,0 +1,92 @@
+"""
+Edges in a scene can carry a weight. actor.top_receivers(MessageClass, k=...) returns
+the best eligible receivers, and actor.sample_receivers(MessageClass, k=...) picks them
+at random in proportion to their weight, which is handy for load balancing.
+
+Both are served from an index that the scene keeps until its graph changes.
+"""
+
+from collections import Counter
+
+from llegos import research as llegos
+
+
+class Task(llegos.Message):
+    ...
+
+
+class Worker(llegos.Actor):
+    def receive_task(self, task: Task):
+        ...
+
+
+class Dispatcher(llegos.Actor):
+    ...
+
+
+class Pool(llegos.Scene):
+    def __init__(
+        self, dispatcher: Dispatcher, workers: list[Worker], weights: list[float]
+    ):
+        super().__init__(actors=[dispatcher, *workers])
+        for worker, weight in zip(workers, weights):
+            self._graph.add_edge(dispatcher, worker, weight=weight)
+        self._graph.add_edge(
+            dispatcher, llegos.Actor(), weight=100
+        )  # can't receive Tasks
+
+
+def test_top_receivers():
+    dispatcher = Dispatcher()
+    workers = [Worker() for _ in range(5)]
+    pool = Pool(dispatcher, workers, weights=[3, 5, 1, 4, 2])
+
+    with pool:
+        assert dispatcher.top_receivers(Task, k=3) == [
+            workers[1],
+            workers[3],
+            workers[0],
+        ]
+        assert dispatcher.top_receivers(Task, k=10) == dispatcher.receivers(Task)
+
+        """
+        Changing the graph invalidates the index.
+        """
+        best = Worker()
+        pool._graph.add_edge(dispatcher, best, weight=10)
+        assert dispatcher.top_receivers(Task) == [best]
+
+        pool._graph.remove_node(best)
+        assert dispatcher.top_receivers(Task) == [workers[1]]
+
+
+def test_sample_receivers():
+    dispatcher = Dispatcher()
+    workers = [Worker() for _ in range(2)]
+    pool = Pool(dispatcher, workers, weights=[1, 9])
+
+    with pool:
+        counts = Counter(dispatcher.sample_receivers(Task, k=10_000))
+        assert set(counts) == set(workers)
+        assert counts[workers[1]] > 4 * counts[workers[0]]
+
+        loner = Dispatcher()
+        pool._graph.add_node(loner)
+        assert loner.sample_receivers(Task) == []
+
+    """
+    With every weight 0, receivers are sampled uniformly, and negative weights can't
+    be sampled from at all.
+    """
+    dispatcher = Dispatcher()
+    workers = [Worker() for _ in range(2)]
+    with Pool(dispatcher, workers, weights=[0, 0]):
+        assert set(dispatcher.sample_receivers(Task, k=1_000)) == set(workers)
+
+    with Pool(dispatcher, workers, weights=[1, -1]):
+        assert dispatcher.top_receivers(Task) == [workers[0]]
+        try:
+            dispatcher.sample_receivers(Task)
+            assert False, "negative weights are invalid"
+        except llegos.InvalidWeight:
+            pass
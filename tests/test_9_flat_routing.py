@@ -0,0 +1,89 @@
+"""
+Scenes are Actors, so a message to a deeply nested scene hops through a receive_* method
+at every level. When those levels only fan out, llegos.routing.SceneRouter can compile
+the hierarchy into flat routes, and send a message straight to the leaf actors.
+"""
+
+from pydantic import Field
+
+from llegos import research as llegos
+from llegos.routing import SceneRouter
+
+
+class Query(llegos.Message):
+    ...
+
+
+class Answer(llegos.Message):
+    source: str
+
+
+class Source(llegos.Actor):
+    name: str
+    queries: int = Field(default=0)
+
+    def receive_query(self, query: Query):
+        assert self.scene  # leaf actors still run within their own scene
+        self.queries += 1
+        return Answer.reply_to(query, source=self.name)
+
+
+class Index(llegos.Scene):
+    def receive_query(self, query: Query):
+        with self:
+            for actor in self.receivers(Query):
+                yield from llegos.message_send(query.forward_to(actor))
+
+
+def build():
+    """
+    root ── a ── a1
+       │    └─── b ── b1
+       │         └─── b2
+       └─── r1
+    """
+    b = Index(actors=[Source(name="b1"), Source(name="b2")])
+    a = Index(actors=[Source(name="a1"), b])
+    return Index(actors=[a, Source(name="r1")]), a, b
+
+
+def test_compiled_routes():
+    root, a, b = build()
+    router = SceneRouter(root)
+
+    routes = router.routes(Query)
+    assert sorted(r.actor.name for r in routes) == ["a1", "b1", "b2", "r1"]
+    assert next(r for r in routes if r.actor.name == "b2").scenes == (root, a, b)
+    assert router.routes(Query) is routes, "routes are cached"
+    assert router.routes(Answer) == ()
+
+    """
+    The router gives the same answers as hopping through each level, in one pass.
+    """
+    user = llegos.Actor()
+    hopped = list(llegos.message_send(Query(sender=user, receiver=root)))
+    flat = list(router.send(Query(sender=user, receiver=root)))
+    assert sorted(m.source for m in hopped) == sorted(m.source for m in flat)
+
+
+def test_routes_invalidate_when_a_sub_scene_changes():
+    root, a, b = build()
+    router = SceneRouter(root)
+    before = router.routes(Query)
+
+    b3 = Source(name="b3")
+    b._graph.add_edge(b, b3)
+
+    after = router.routes(Query)
+    assert after is not before
+    assert b3 in router.receivers(Query)
+
+
+def test_opaque_sub_scenes():
+    root, a, b = build()
+    router = SceneRouter(root, descend=lambda scene: scene is not b)
+    assert sorted(getattr(actor, "name", "b") for actor in router.receivers(Query)) == [
+        "a1",
+        "b",
+        "r1",
+    ]